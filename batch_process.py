@@ -0,0 +1,336 @@
+"""
+Batch processing of recorded videos and image sequences into landmark datasets.
+
+Every input is run through HandTracker in a pool of worker processes (one
+MediaPipe instance per worker). Each input produces a compressed .npz file with
+the per-frame landmarks, and a manifest records per-file throughput so an
+interrupted run can be resumed.
+
+Each .npz holds "landmarks" (N, 21, 3), "present" (N,) and "timestamps" (N,).
+Frames without a hand are all-zero landmark rows with present False; pass
+present to GestureRecognizer.recognize_batch so they are not read as a hand.
+
+Usage:
+    python batch_process.py recordings/ --output landmark_dataset
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+import config
+from frame_sources import ImageSequenceSource, VideoFileSource, PACING_UNTHROTTLED
+from utils import landmarks_to_array
+
+NUM_LANDMARKS = 21
+
+# Per-worker hand tracker, created once by _init_worker
+_tracker = None
+
+
+def find_inputs(input_dir):
+    """
+    Find video files and image sequence directories under input_dir.
+    
+    A directory counts as an image sequence when it directly contains image
+    files; its frames are read in sorted filename order.
+    
+    Args:
+        input_dir: Directory to search recursively
+    
+    Returns:
+        Sorted list of input paths (video files and sequence directories)
+    """
+    inputs = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        has_images = False
+        for name in sorted(files):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in config.VIDEO_EXTENSIONS:
+                inputs.append(os.path.join(root, name))
+            elif ext in config.IMAGE_EXTENSIONS:
+                has_images = True
+        
+        if has_images:
+            inputs.append(root)
+    
+    return sorted(inputs)
+
+
+def output_name(input_path, input_dir):
+    """
+    Build a flat, unique landmark file name for an input.
+    
+    Args:
+        input_path: Path of the video file or sequence directory
+        input_dir: Root directory of the batch
+    
+    Returns:
+        File name ending in .npz
+    """
+    relative = os.path.relpath(input_path, input_dir)
+    if relative == os.curdir:
+        relative = os.path.basename(os.path.abspath(input_dir))
+    return relative.replace(os.sep, "__") + ".npz"
+
+
+def iter_frames(input_path, sequence_fps):
+    """
+    Yield (timestamp, frame) pairs from a video file or image sequence.
+    
+    Args:
+        input_path: Path of the video file or sequence directory
+        sequence_fps: Frame rate assumed for image sequences
+    
+    Yields:
+        Tuple of (timestamp in seconds, BGR frame)
+    """
+    if os.path.isdir(input_path):
+        source = ImageSequenceSource(input_path, fps=sequence_fps,
+                                     pacing=PACING_UNTHROTTLED)
+    else:
+        source = VideoFileSource(input_path, pacing=PACING_UNTHROTTLED)
+    
+    if not source.open():
+        raise IOError(f"Could not open {input_path}")
+    
+    try:
+        while True:
+            frame = source.read()
+            if frame is None:
+                break
+            yield source.position, frame
+    finally:
+        source.release()
+
+
+def _init_worker():
+    """Create the hand tracker for this worker process."""
+    global _tracker
+    
+    # One OpenCV thread per worker, the pool already uses every core
+    cv2.setNumThreads(1)
+    
+    from hand_tracker import HandTracker
+    _tracker = HandTracker()
+
+
+def process_input(input_path, output_path, sequence_fps, mirror):
+    """
+    Run hand tracking over one input and write its landmark file.
+    
+    The file is written under a temporary name and renamed when complete, so
+    an interrupted run never leaves a truncated output behind.
+    
+    Args:
+        input_path: Path of the video file or sequence directory
+        output_path: Destination .npz file
+        sequence_fps: Frame rate assumed for image sequences
+        mirror: Flip frames horizontally like the live camera does
+    
+    Returns:
+        Manifest entry dictionary for this input
+    """
+    start_time = time.perf_counter()
+    
+    # Video-mode tracking state must not carry over from the previous input
+    _tracker.reset()
+    
+    timestamps = []
+    landmark_rows = []
+    present = []
+    
+    for timestamp, frame in iter_frames(input_path, sequence_fps):
+        if mirror:
+            frame = cv2.flip(frame, 1)
+        
+        results = _tracker.process_frame(frame)
+        landmarks = _tracker.get_landmarks(results)
+        
+        row = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        if landmarks is not None:
+            landmarks_to_array(landmarks, out=row)
+        
+        timestamps.append(timestamp)
+        landmark_rows.append(row)
+        present.append(landmarks is not None)
+    
+    if landmark_rows:
+        landmark_array = np.stack(landmark_rows)
+    else:
+        landmark_array = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez_compressed(
+            f,
+            landmarks=landmark_array,
+            present=np.array(present, dtype=bool),
+            timestamps=np.array(timestamps, dtype=np.float64),
+        )
+    os.replace(temp_path, output_path)
+    
+    elapsed = time.perf_counter() - start_time
+    frames = len(landmark_rows)
+    stat = os.stat(input_path)
+    
+    return {
+        "output": os.path.basename(output_path),
+        "status": "done",
+        "frames": frames,
+        "hand_frames": int(sum(present)),
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+    }
+
+
+def load_manifest(manifest_path):
+    """
+    Load an existing manifest, or return an empty one.
+    
+    Args:
+        manifest_path: Path of manifest.json
+    
+    Returns:
+        Manifest dictionary
+    """
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+    
+    return {"files": {}}
+
+
+def save_manifest(manifest, manifest_path):
+    """Write the manifest atomically."""
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+
+def is_complete(entry, input_path, output_dir):
+    """
+    Check whether a manifest entry is still valid for resume.
+    
+    Args:
+        entry: Manifest entry for the input, or None
+        input_path: Path of the video file or sequence directory
+        output_dir: Directory holding the landmark files
+    
+    Returns:
+        True if the input was fully processed and has not changed since
+    """
+    if not entry or entry.get("status") != "done":
+        return False
+    
+    if not os.path.exists(os.path.join(output_dir, entry["output"])):
+        return False
+    
+    stat = os.stat(input_path)
+    return (entry.get("source_size") == stat.st_size and
+            entry.get("source_mtime") == stat.st_mtime)
+
+
+def run_batch(input_dir, output_dir, workers=None, sequence_fps=config.TARGET_FPS,
+              mirror=True, resume=True):
+    """
+    Process every input under input_dir in parallel.
+    
+    Args:
+        input_dir: Directory of videos and image sequences
+        output_dir: Directory for landmark files and the manifest
+        workers: Number of worker processes (default: all CPU cores)
+        sequence_fps: Frame rate assumed for image sequences
+        mirror: Flip frames horizontally like the live camera does
+        resume: Skip inputs already completed in the manifest
+    
+    Returns:
+        Manifest dictionary
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, config.BATCH_MANIFEST_NAME)
+    manifest = load_manifest(manifest_path) if resume else {"files": {}}
+    
+    inputs = find_inputs(input_dir)
+    pending = []
+    for input_path in inputs:
+        key = os.path.relpath(input_path, input_dir)
+        if resume and is_complete(manifest["files"].get(key), input_path, output_dir):
+            continue
+        pending.append((key, input_path))
+    
+    workers = workers or os.cpu_count() or 1
+    print(f"Found {len(inputs)} inputs, {len(pending)} to process "
+          f"with {workers} workers")
+    
+    batch_start = time.perf_counter()
+    total_frames = 0
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {}
+        for key, input_path in pending:
+            output_path = os.path.join(output_dir, output_name(input_path, input_dir))
+            future = pool.submit(process_input, input_path, output_path,
+                                 sequence_fps, mirror)
+            futures[future] = key
+        
+        for done, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            try:
+                entry = future.result()
+                total_frames += entry["frames"]
+                print(f"[{done}/{len(futures)}] {key}: {entry['frames']} frames "
+                      f"at {entry['fps']:.1f} FPS")
+            except Exception as e:
+                entry = {"status": "failed", "error": str(e)}
+                print(f"[{done}/{len(futures)}] {key}: failed ({e})")
+            
+            # Save after every file so an interrupted run can resume
+            manifest["files"][key] = entry
+            save_manifest(manifest, manifest_path)
+    
+    elapsed = time.perf_counter() - batch_start
+    if elapsed > 0 and total_frames:
+        print(f"Processed {total_frames} frames in {elapsed:.1f}s "
+              f"({total_frames / elapsed:.1f} FPS overall)")
+    
+    return manifest
+
+
+def main():
+    """Parse arguments and run the batch."""
+    parser = argparse.ArgumentParser(
+        description="Extract hand landmarks from recorded videos and image sequences.")
+    parser.add_argument("input_dir", help="Directory of videos and image sequences")
+    parser.add_argument("--output", default=config.BATCH_OUTPUT_DIR,
+                        help="Output directory for landmark files and manifest")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: all CPU cores)")
+    parser.add_argument("--sequence-fps", type=float, default=config.TARGET_FPS,
+                        help="Frame rate assumed for image sequences")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="Do not flip frames horizontally")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the existing manifest and reprocess everything")
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: {args.input_dir} is not a directory")
+        sys.exit(1)
+    
+    run_batch(args.input_dir, args.output, workers=args.workers,
+              sequence_fps=args.sequence_fps, mirror=not args.no_mirror,
+              resume=not args.restart)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Micro-benchmarks and performance checks for the gesture control pipeline.
+
+Usage:
+    python benchmark.py allocations
+    python benchmark.py overlay
+    python benchmark.py recognizer
+    python benchmark.py calibration
+    python benchmark.py flow recording.mp4
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import config
+from calibration import Calibration
+from frame_sources import PACING_UNTHROTTLED, VideoFileSource
+from gesture_recognizer import GestureRecognizer
+from overlay import HudLayer, OverlayRenderer
+from synthetic_landmarks import generate_mixed, generate_sequence, to_landmark_list
+from utils import normalize_to_screen
+
+
+def measure_allocations(frames=1000, warmup=200):
+    """
+    Measure memory allocated by GestureRecognizer.recognize per frame.
+    
+    Each frame is measured as the tracemalloc peak above the memory in use
+    before the call, so short-lived temporaries count even if they are freed
+    before recognize() returns.
+    
+    Args:
+        frames: Number of frames to measure
+        warmup: Frames run before measuring, to reach the steady state
+    
+    Returns:
+        Dictionary with the worst-case bytes allocated per frame for frames
+        with a hand and without a hand
+    """
+    recognizer = GestureRecognizer(config.CAMERA_WIDTH, config.CAMERA_HEIGHT,
+                                   screen_size=(1920, 1080), verbose=False)
+    sequence = generate_mixed(warmup + frames, seed=0)
+    hands = [to_landmark_list(row) for row in sequence]
+    dt = 1.0 / config.TARGET_FPS
+    
+    tracemalloc.start()
+    try:
+        # Cost of the measurement itself, subtracted from every frame
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        overhead = tracemalloc.get_traced_memory()[1] - before
+        
+        worst = {"hand": 0, "no_hand": 0}
+        for i in range(warmup + frames):
+            t = i * dt
+            has_hand = (i // 90) % 4 != 3
+            landmarks = hands[i] if has_hand else None
+            
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            recognizer.recognize(landmarks, t)
+            allocated = tracemalloc.get_traced_memory()[1] - before - overhead
+            
+            if i >= warmup:
+                key = "hand" if has_hand else "no_hand"
+                worst[key] = max(worst[key], allocated)
+    finally:
+        tracemalloc.stop()
+    
+    return worst
+
+
+def run_allocations(args):
+    """Check that the recognizer hot loop does not allocate."""
+    worst = measure_allocations(frames=args.frames)
+    print(f"Max bytes allocated per frame (hand):    {worst['hand']}")
+    print(f"Max bytes allocated per frame (no hand): {worst['no_hand']}")
+    
+    if worst["hand"] > 0 or worst["no_hand"] > 0:
+        print("✗ Recognizer allocates in the steady state")
+        return 1
+    
+    print("✓ Recognizer is allocation-free in the steady state")
+    return 0
+
+
+def _time_per_call(func, iterations):
+    """Return the average seconds per call of func over iterations."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations
+
+
+def _legacy_hud(frame, fps, state, hand_detected):
+    """Text HUD as drawn directly onto every frame before HudLayer."""
+    cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    cv2.putText(frame, f"State: {state}", (10, 70),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+    hand_status = "Hand Detected" if hand_detected else "No Hand"
+    color = (0, 255, 0) if hand_detected else (0, 0, 255)
+    cv2.putText(frame, hand_status, (10, 110),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+
+def run_overlay(args):
+    """Compare overlay drawing cost against MediaPipe's drawing utilities."""
+    landmark_array = generate_sequence("point", 1, seed=0)[0]
+    frame = np.zeros((config.CAMERA_HEIGHT, config.CAMERA_WIDTH, 3), dtype=np.uint8)
+    
+    renderer = OverlayRenderer()
+    hud = HudLayer()
+    timings = {
+        "OverlayRenderer.draw_hand": _time_per_call(
+            lambda: renderer.draw_hand(frame, landmark_array), args.iterations),
+        "HudLayer.draw": _time_per_call(
+            lambda: hud.draw(frame, 30.0, config.STATE_HOVERING, True), args.iterations),
+        "putText HUD (previous)": _time_per_call(
+            lambda: _legacy_hud(frame, 30.0, config.STATE_HOVERING, True), args.iterations),
+    }
+    
+    try:
+        import mediapipe as mp
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        print("MediaPipe not installed, skipping drawing_utils baseline")
+    else:
+        hand_landmarks = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in landmark_array.tolist():
+            hand_landmarks.landmark.add(x=x, y=y, z=z)
+        drawing = mp.solutions.drawing_utils
+        styles = mp.solutions.drawing_styles
+        
+        def legacy_draw():
+            drawing.draw_landmarks(
+                frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS,
+                styles.get_default_hand_landmarks_style(),
+                styles.get_default_hand_connections_style())
+        
+        timings["drawing_utils.draw_landmarks (previous)"] = _time_per_call(
+            legacy_draw, args.iterations)
+    
+    for name, seconds in timings.items():
+        print(f"{name:<45}{seconds * 1e6:>10.1f} us")
+    return 0
+
+
+def run_recognizer(args):
+    """Measure recognizer throughput per frame and in batches."""
+    screen_size = (1920, 1080)
+    frames = args.frames
+    landmarks = generate_mixed(frames, seed=0)
+    stream_ids = np.arange(frames) % args.streams
+    timestamps = (np.arange(frames) // args.streams) / config.TARGET_FPS
+    
+    # Every 10th frame without a hand
+    landmarks[::10] = np.nan
+    
+    # Frame by frame through recognize()
+    per_frame = GestureRecognizer(config.CAMERA_WIDTH, config.CAMERA_HEIGHT,
+                                  screen_size=screen_size, verbose=False)
+    rows = [None if np.isnan(row).any() else to_landmark_list(row) for row in landmarks]
+    expected_cursor = np.zeros((frames, 2))
+    expected_clicks = np.zeros((frames, 2), dtype=bool)
+    expected_scroll = np.full(frames, np.nan)
+    
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        result = per_frame._stream(int(stream_ids[i])).recognize(row, float(timestamps[i]))
+        expected_cursor[i] = (result.cursor_x, result.cursor_y)
+        expected_clicks[i] = (result.left_click, result.right_click)
+        if result.scroll is not None:
+            expected_scroll[i] = result.scroll
+    single_seconds = time.perf_counter() - start
+    
+    # Whole batch through recognize_batch()
+    batch = GestureRecognizer(config.CAMERA_WIDTH, config.CAMERA_HEIGHT,
+                              screen_size=screen_size, verbose=False)
+    start = time.perf_counter()
+    results = batch.recognize_batch(landmarks, stream_ids, timestamps)
+    batch_seconds = time.perf_counter() - start
+    
+    # batch_process.py layout: zero rows plus a present mask
+    present = ~np.isnan(landmarks).any(axis=(1, 2))
+    masked = GestureRecognizer(config.CAMERA_WIDTH, config.CAMERA_HEIGHT,
+                               screen_size=screen_size, verbose=False)
+    masked_results = masked.recognize_batch(np.nan_to_num(landmarks), stream_ids,
+                                            timestamps, present=present)
+    
+    identical = all(
+        np.array_equal(batch_results['cursor_pos'], expected_cursor) and
+        np.array_equal(batch_results['left_click'], expected_clicks[:, 0]) and
+        np.array_equal(batch_results['right_click'], expected_clicks[:, 1]) and
+        np.array_equal(batch_results['scroll'], expected_scroll, equal_nan=True)
+        for batch_results in (results, masked_results))
+    
+    print(f"Frames: {frames} across {args.streams} streams")
+    print(f"Left clicks: {results['left_click'].sum()}, right clicks: "
+          f"{results['right_click'].sum()}, scroll frames: "
+          f"{(~np.isnan(results['scroll'])).sum()}")
+    print(f"recognize():       {frames / single_seconds:>12,.0f} frames/s")
+    print(f"recognize_batch(): {frames / batch_seconds:>12,.0f} frames/s")
+    
+    if not identical:
+        print("✗ Batch results differ from frame-by-frame results")
+        return 1
+    
+    print("✓ Batch results identical to frame-by-frame results")
+    return 0
+
+
+def run_calibration(args):
+    """Compare landmark undistortion against undistorting the full frame."""
+    width, height = config.CAMERA_WIDTH, config.CAMERA_HEIGHT
+    camera_matrix = np.array([[0.9 * width, 0.0, width / 2],
+                              [0.0, 0.9 * width, height / 2],
+                              [0.0, 0.0, 1.0]])
+    dist_coeffs = np.array([-0.3, 0.1, 0.0, 0.0, 0.0])
+    calibration = Calibration(camera_matrix, dist_coeffs, (width, height),
+                              x_knots=((0.1, 0.05), (0.45, 0.5), (0.9, 0.95)),
+                              y_knots=((0.2, 0.05), (0.5, 0.5), (0.8, 0.95)))
+    calibration.prepare(width, height)
+    
+    landmarks = to_landmark_list(generate_sequence("point", 1, seed=0)[0])
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    screen_size = (1920, 1080)
+    
+    def landmark_path():
+        tip = calibration.undistort(landmarks)[config.INDEX_TIP]
+        normalize_to_screen(tip.x, tip.y, width, height, screen_size, calibration.lut)
+    
+    timings = {
+        "undistort landmarks + screen LUT": _time_per_call(landmark_path, args.iterations),
+        "cv2.undistort full frame (alternative)": _time_per_call(
+            lambda: cv2.undistort(frame, camera_matrix, dist_coeffs), args.iterations // 10),
+    }
+    
+    for name, seconds in timings.items():
+        print(f"{name:<45}{seconds * 1e6:>10.1f} us")
+    return 0
+
+
+def _index_tips(tracker, frames):
+    """
+    Run a hand tracker over frames.
+    
+    Returns:
+        Tuple of ((N, 2) index tip positions in pixels, NaN without a hand,
+        seconds taken)
+    """
+    tips = np.full((len(frames), 2), np.nan)
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        landmarks = tracker.get_landmarks(tracker.process_frame(frame))
+        if landmarks is not None:
+            tip = landmarks[config.INDEX_TIP]
+            tips[i] = (tip.x, tip.y)
+    seconds = time.perf_counter() - start
+    
+    if frames:
+        height, width = frames[0].shape[:2]
+        tips *= (width, height)
+    return tips, seconds
+
+
+def run_flow(args):
+    """Compare optical-flow tracking with MediaPipe inference on every frame."""
+    try:
+        from hand_tracker import HandTracker
+        from flow_tracker import FlowTracker
+    except ImportError as e:
+        print(f"✗ MediaPipe not available: {e}")
+        return 1
+    
+    source = VideoFileSource(args.video, pacing=PACING_UNTHROTTLED)
+    if not source.open():
+        return 1
+    frames = []
+    while len(frames) < args.frames:
+        frame = source.read()
+        if frame is None:
+            break
+        frames.append(cv2.flip(frame, 1))
+    source.release()
+    if not frames:
+        print(f"✗ No frames read from {args.video}")
+        return 1
+    
+    tracker = HandTracker()
+    reference, inference_seconds = _index_tips(tracker, frames)
+    tracker.release()
+    
+    flow = FlowTracker(HandTracker())
+    tracked, flow_seconds = _index_tips(flow, frames)
+    flow.release()
+    
+    both = ~np.isnan(reference[:, 0]) & ~np.isnan(tracked[:, 0])
+    deviation = np.hypot(*(tracked[both] - reference[both]).T)
+    missed = int((~np.isnan(reference[:, 0]) & np.isnan(tracked[:, 0])).sum())
+    
+    print(f"Frames: {len(frames)} from {args.video}")
+    print(f"MediaPipe every frame: {inference_seconds / len(frames) * 1000:>8.2f} ms/frame")
+    print(f"Optical flow tracking: {flow_seconds / len(frames) * 1000:>8.2f} ms/frame "
+          f"({flow.inference_count} inferences, {flow.flow_count} tracked frames)")
+    if deviation.size:
+        print(f"Index tip deviation:   {deviation.mean():>8.2f} px mean, "
+              f"{np.percentile(deviation, 95):.2f} px 95th percentile, "
+              f"{deviation.max():.2f} px max")
+    print(f"Hand missed by flow tracking in {missed} frames")
+    return 0
+
+
+def main():
+    """Parse arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description="Gesture control benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    allocations = subparsers.add_parser(
+        "allocations", help="Check per-frame allocations of the recognizer")
+    allocations.add_argument("--frames", type=int, default=1000)
+    allocations.set_defaults(func=run_allocations)
+    
+    overlay = subparsers.add_parser(
+        "overlay", help="Compare overlay drawing cost with MediaPipe drawing")
+    overlay.add_argument("--iterations", type=int, default=2000)
+    overlay.set_defaults(func=run_overlay)
+    
+    recognizer = subparsers.add_parser(
+        "recognizer", help="Recognizer throughput on synthetic landmarks")
+    recognizer.add_argument("--frames", type=int, default=100000)
+    recognizer.add_argument("--streams", type=int, default=4)
+    recognizer.set_defaults(func=run_recognizer)
+    
+    calibration = subparsers.add_parser(
+        "calibration", help="Compare landmark undistortion with full-frame undistortion")
+    calibration.add_argument("--iterations", type=int, default=2000)
+    calibration.set_defaults(func=run_calibration)
+    
+    flow = subparsers.add_parser(
+        "flow", help="Optical-flow tracking vs full inference on a recorded video")
+    flow.add_argument("video", help="Recorded video with a hand in view")
+    flow.add_argument("--frames", type=int, default=600)
+    flow.set_defaults(func=run_flow)
+    
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+"""
+Camera calibration: lens undistortion of landmarks and a calibrated
+camera-to-screen mapping.
+
+Usage:
+    python calibration.py intrinsics   # Lens intrinsics from a printed chessboard
+    python calibration.py region       # Point at on-screen targets to map hand range
+
+Both steps update the same JSON file, which main.py loads at startup. At
+runtime only the 21 landmarks are undistorted (cv2.undistortPoints), never
+the full frame, and the camera-to-screen mapping is precomputed into per-axis
+lookup tables used by normalize_to_screen.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+import cv2
+import numpy as np
+import config
+from frame_sources import PACING_UNTHROTTLED
+from utils import Landmark
+
+NUM_LANDMARKS = 21
+IDENTITY_KNOTS = ((0.0, 0.0), (1.0, 1.0))
+
+
+def _axis_table(knots, samples):
+    """
+    Evaluate a piecewise-linear axis mapping at the given samples.
+    
+    Args:
+        knots: Sequence of (camera, screen) pairs with increasing camera values
+        samples: Normalized camera coordinates to evaluate
+    
+    Returns:
+        Screen fractions clipped to 0-1; outside the knots the end segments
+        are extended linearly
+    """
+    knots = np.asarray(knots, dtype=np.float64)
+    cams, screens = knots[:, 0], knots[:, 1]
+    values = np.interp(samples, cams, screens)
+    
+    first_slope = (screens[1] - screens[0]) / (cams[1] - cams[0])
+    last_slope = (screens[-1] - screens[-2]) / (cams[-1] - cams[-2])
+    below = samples < cams[0]
+    above = samples > cams[-1]
+    values[below] = screens[0] + first_slope * (samples[below] - cams[0])
+    values[above] = screens[-1] + last_slope * (samples[above] - cams[-1])
+    return np.clip(values, 0.0, 1.0)
+
+
+class ScreenLUT:
+    """Per-axis lookup tables from normalized camera coordinates to screen fractions."""
+    
+    __slots__ = ("x_table", "y_table", "low", "scale", "last")
+    
+    def __init__(self, x_knots=IDENTITY_KNOTS, y_knots=IDENTITY_KNOTS,
+                 size=config.CALIBRATION_LUT_SIZE, input_range=config.CALIBRATION_LUT_RANGE):
+        """
+        Precompute the lookup tables.
+        
+        Args:
+            x_knots: (camera, screen) pairs for the horizontal axis
+            y_knots: (camera, screen) pairs for the vertical axis
+            size: Entries per table
+            input_range: (low, high) normalized camera range covered; values
+                outside it map to the first or last entry
+        """
+        low, high = input_range
+        samples = np.linspace(low, high, size)
+        
+        # Plain lists: scalar indexing is much cheaper than on NumPy arrays
+        self.x_table = _axis_table(x_knots, samples).tolist()
+        self.y_table = _axis_table(y_knots, samples).tolist()
+        self.low = low
+        self.scale = (size - 1) / (high - low)
+        self.last = size - 1
+    
+    def lookup(self, x, y):
+        """
+        Map a normalized camera position to screen fractions.
+        
+        Args:
+            x: Normalized x coordinate
+            y: Normalized y coordinate
+        
+        Returns:
+            Tuple of (x, y) screen fractions in the 0-1 range
+        """
+        return self._interpolate(self.x_table, x), self._interpolate(self.y_table, y)
+    
+    def _interpolate(self, table, value):
+        """Linearly interpolate between the two nearest table entries."""
+        position = (value - self.low) * self.scale
+        if position <= 0:
+            return table[0]
+        if position >= self.last:
+            return table[self.last]
+        
+        i = int(position)
+        low = table[i]
+        return low + (position - i) * (table[i + 1] - low)
+
+
+class Calibration:
+    """Camera intrinsics and active-region mapping loaded from disk."""
+    
+    def __init__(self, camera_matrix=None, dist_coeffs=None, image_size=None,
+                 x_knots=None, y_knots=None, data=None):
+        """
+        Initialize calibration.
+        
+        Args:
+            camera_matrix: 3x3 camera matrix, or None to skip undistortion
+            dist_coeffs: Distortion coefficients matching camera_matrix
+            image_size: (width, height) the intrinsics were measured at
+            x_knots: (camera, screen) pairs for the horizontal axis, or None
+            y_knots: (camera, screen) pairs for the vertical axis, or None
+            data: Other fields to keep when saving (e.g. reprojection error)
+        """
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.image_size = image_size
+        self.x_knots = x_knots
+        self.y_knots = y_knots
+        self.data = dict(data or {})
+        
+        self.lut = None
+        self.frame_width = 0
+        self.frame_height = 0
+        self._frame_matrix = None
+        self._points = np.zeros((NUM_LANDMARKS, 1, 2), dtype=np.float32)
+        self._undistorted = np.zeros((NUM_LANDMARKS, 1, 2), dtype=np.float32)
+        self._landmarks = [Landmark() for _ in range(NUM_LANDMARKS)]
+    
+    @property
+    def has_intrinsics(self):
+        return self.camera_matrix is not None
+    
+    @property
+    def has_region(self):
+        return self.x_knots is not None and self.y_knots is not None
+    
+    @classmethod
+    def load(cls, path=config.CALIBRATION_PATH):
+        """
+        Load a calibration file.
+        
+        Args:
+            path: Path of the calibration JSON
+        
+        Returns:
+            Calibration, or None if the file does not exist or is invalid
+        """
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            intrinsics = data.get("intrinsics")
+            region = data.get("screen_mapping")
+            calibration = cls(
+                camera_matrix=(np.array(intrinsics["camera_matrix"], dtype=np.float64)
+                               if intrinsics else None),
+                dist_coeffs=(np.array(intrinsics["dist_coeffs"], dtype=np.float64)
+                             if intrinsics else None),
+                image_size=tuple(intrinsics["image_size"]) if intrinsics else None,
+                x_knots=[tuple(knot) for knot in region["x"]] if region else None,
+                y_knots=[tuple(knot) for knot in region["y"]] if region else None,
+                data=data)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Ignoring calibration {path}: {e}")
+            return None
+        
+        print(f"Calibration loaded from {path} (intrinsics: "
+              f"{'yes' if calibration.has_intrinsics else 'no'}, screen mapping: "
+              f"{'yes' if calibration.has_region else 'no'})")
+        return calibration
+    
+    def save(self, path=config.CALIBRATION_PATH):
+        """
+        Write the calibration to disk.
+        
+        Args:
+            path: Path of the calibration JSON
+        """
+        data = dict(self.data)
+        data["created"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        if self.has_intrinsics:
+            data["intrinsics"] = {
+                "image_size": list(self.image_size),
+                "camera_matrix": self.camera_matrix.tolist(),
+                "dist_coeffs": np.ravel(self.dist_coeffs).tolist(),
+                "reprojection_error": self.data.get("intrinsics", {}).get(
+                    "reprojection_error"),
+            }
+        if self.has_region:
+            data["screen_mapping"] = {
+                "x": [list(knot) for knot in self.x_knots],
+                "y": [list(knot) for knot in self.y_knots],
+            }
+        
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    
+    def prepare(self, frame_width, frame_height):
+        """
+        Precompute everything the per-frame path needs for a frame size.
+        
+        Args:
+            frame_width: Width of the frames landmarks are normalized to
+            frame_height: Height of the frames landmarks are normalized to
+        """
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        
+        if self.has_intrinsics:
+            # Intrinsics scale with the resolution (same sensor crop assumed)
+            calib_width, calib_height = self.image_size
+            if abs(calib_width * frame_height - calib_height * frame_width) > calib_height:
+                print(f"Warning: Calibrated at {calib_width}x{calib_height}, frames are "
+                      f"{frame_width}x{frame_height}; recalibrate at this aspect ratio")
+            matrix = self.camera_matrix.copy()
+            matrix[0] *= frame_width / calib_width
+            matrix[1] *= frame_height / calib_height
+            self._frame_matrix = matrix
+        
+        self.lut = ScreenLUT(self.x_knots or IDENTITY_KNOTS,
+                             self.y_knots or IDENTITY_KNOTS)
+    
+    def undistort(self, landmarks):
+        """
+        Undistort the 21 hand landmarks.
+        
+        Args:
+            landmarks: List of normalized landmarks
+        
+        Returns:
+            List of undistorted normalized landmarks. The same list is
+            returned (and overwritten) on every call.
+        """
+        out = self._landmarks
+        if self._frame_matrix is None:
+            for landmark, target in zip(landmarks, out):
+                target.x = landmark.x
+                target.y = landmark.y
+                target.z = landmark.z
+            return out
+        
+        width = self.frame_width
+        height = self.frame_height
+        points = self._points
+        for i, landmark in enumerate(landmarks):
+            points[i, 0, 0] = landmark.x * width
+            points[i, 0, 1] = landmark.y * height
+        
+        cv2.undistortPoints(points, self._frame_matrix, self.dist_coeffs,
+                            dst=self._undistorted, P=self._frame_matrix)
+        
+        for (x, y), landmark, target in zip(self._undistorted[:, 0].tolist(),
+                                            landmarks, out):
+            target.x = x / width
+            target.y = y / height
+            target.z = landmark.z
+        return out
+
+
+def _open_camera(source_spec):
+    """Start a CameraHandler; file sources are read as fast as possible."""
+    from camera_handler import CameraHandler
+    
+    live = isinstance(source_spec, int) or str(source_spec).isdigit()
+    camera = CameraHandler(source_spec, pacing=None if live else PACING_UNTHROTTLED)
+    if not camera.start():
+        return None, live
+    return camera, live
+
+
+def calibrate_intrinsics(source_spec, path=config.CALIBRATION_PATH,
+                         board=config.CALIBRATION_CHESSBOARD, views=config.CALIBRATION_VIEWS):
+    """
+    Measure lens intrinsics from views of a printed chessboard.
+    
+    With a camera, a view is captured automatically whenever the board is
+    found (at most once per CALIBRATION_CAPTURE_INTERVAL); move and tilt the
+    board between captures. Video files and image directories are used frame
+    by frame without a window.
+    
+    Args:
+        source_spec: Camera index, video file or image directory
+        path: Calibration JSON to update
+        board: (columns, rows) inner corners of the chessboard
+        views: Number of views to capture
+    
+    Returns:
+        True if the calibration was written
+    """
+    camera, live = _open_camera(source_spec)
+    if camera is None:
+        print("✗ Could not open source")
+        return False
+    
+    object_corners = np.zeros((board[0] * board[1], 3), dtype=np.float32)
+    object_corners[:, :2] = np.mgrid[0:board[0], 0:board[1]].T.reshape(-1, 2)
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    flags = cv2.CALIB_CB_ADAPTIVE_THRESH | cv2.CALIB_CB_NORMALIZE_IMAGE
+    if live:
+        flags |= cv2.CALIB_CB_FAST_CHECK
+    
+    object_points = []
+    image_points = []
+    last_capture = -float("inf")
+    
+    try:
+        while len(image_points) < views:
+            frame = camera.read_frame()
+            if frame is None:
+                break
+            
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            found, corners = cv2.findChessboardCorners(gray, board, flags=flags)
+            now = time.monotonic()
+            if found and (not live or now - last_capture >= config.CALIBRATION_CAPTURE_INTERVAL):
+                corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
+                object_points.append(object_corners)
+                image_points.append(corners)
+                last_capture = now
+                print(f"  Captured view {len(image_points)}/{views}")
+            
+            if live:
+                cv2.drawChessboardCorners(frame, board, corners, found)
+                cv2.putText(frame, f"Views: {len(image_points)}/{views} (ESC to stop)",
+                            (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+                cv2.imshow("Calibration", frame)
+                if cv2.waitKey(1) & 0xFF == 27:
+                    break
+        
+        image_size = camera.get_dimensions()
+    finally:
+        camera.release()
+        if live:
+            cv2.destroyAllWindows()
+    
+    if len(image_points) < config.CALIBRATION_MIN_VIEWS:
+        print(f"✗ Only {len(image_points)} chessboard views found, "
+              f"need at least {config.CALIBRATION_MIN_VIEWS}")
+        return False
+    
+    error, camera_matrix, dist_coeffs, _, _ = cv2.calibrateCamera(
+        object_points, image_points, image_size, None, None)
+    
+    calibration = Calibration.load(path) or Calibration()
+    calibration.camera_matrix = camera_matrix
+    calibration.dist_coeffs = dist_coeffs
+    calibration.image_size = image_size
+    calibration.data["intrinsics"] = {"reprojection_error": round(float(error), 4)}
+    calibration.save(path)
+    
+    print(f"✓ Intrinsics from {len(image_points)} views "
+          f"(reprojection error {error:.3f} px) written to {path}")
+    return True
+
+
+def calibrate_region(source_spec, path=config.CALIBRATION_PATH):
+    """
+    Map the comfortable hand range to the screen.
+    
+    A 3x3 grid of targets is shown full screen one at a time; point the index
+    finger at each and press SPACE. The undistorted fingertip positions
+    become the knots of the per-axis camera-to-screen mapping.
+    
+    Args:
+        source_spec: Camera index (or recording) to track the hand in
+        path: Calibration JSON to update
+    
+    Returns:
+        True if the calibration was written
+    """
+    import pyautogui
+    from hand_tracker import HandTracker
+    
+    camera, _ = _open_camera(source_spec)
+    if camera is None:
+        print("✗ Could not open source")
+        return False
+    
+    calibration = Calibration.load(path) or Calibration()
+    frame_width, frame_height = camera.get_dimensions()
+    calibration.prepare(frame_width, frame_height)
+    tracker = HandTracker()
+    
+    screen_width, screen_height = pyautogui.size()
+    canvas = np.zeros((screen_height, screen_width, 3), dtype=np.uint8)
+    window = "Calibration"
+    cv2.namedWindow(window, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(window, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    
+    fractions = config.CALIBRATION_TARGETS
+    targets = [(fx, fy) for fy in fractions for fx in fractions]
+    recent = deque(maxlen=config.CALIBRATION_HOLD_FRAMES)
+    captured = []
+    
+    try:
+        while len(captured) < len(targets):
+            frame = camera.read_frame()
+            if frame is None:
+                break
+            
+            landmarks = tracker.get_landmarks(tracker.process_frame(frame))
+            if landmarks is None:
+                recent.clear()
+            else:
+                tip = calibration.undistort(landmarks)[config.INDEX_TIP]
+                recent.append((tip.x, tip.y))
+            
+            target_x, target_y = targets[len(captured)]
+            center = (int(target_x * screen_width), int(target_y * screen_height))
+            canvas[:] = 0
+            cv2.circle(canvas, center, 20, (0, 0, 255), 2)
+            cv2.circle(canvas, center, 4, (0, 0, 255), -1)
+            cv2.putText(canvas, f"Point at the target and press SPACE "
+                        f"({len(captured) + 1}/{len(targets)}, ESC to cancel)",
+                        (40, screen_height // 2 - 60), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.8, (255, 255, 255), 2)
+            preview = cv2.resize(frame, (320, 240))
+            canvas[-250:-10, 10:330] = preview
+            cv2.imshow(window, canvas)
+            
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:
+                print("✗ Cancelled")
+                return False
+            if key == 32 and len(recent) == recent.maxlen:
+                captured.append(np.median(np.array(recent), axis=0))
+                recent.clear()
+    finally:
+        camera.release()
+        tracker.release()
+        cv2.destroyAllWindows()
+    
+    if len(captured) < len(targets):
+        print("✗ Source ended before all targets were captured")
+        return False
+    
+    # Median fingertip position per column (x) and per row (y)
+    grid = np.array(captured).reshape(len(fractions), len(fractions), 2)
+    x_cams = np.median(grid[:, :, 0], axis=0)
+    y_cams = np.median(grid[:, :, 1], axis=1)
+    if np.any(np.diff(x_cams) <= 0) or np.any(np.diff(y_cams) <= 0):
+        print("✗ Targets were not captured left to right and top to bottom, try again")
+        return False
+    
+    calibration.x_knots = [(float(cam), target) for cam, target in zip(x_cams, fractions)]
+    calibration.y_knots = [(float(cam), target) for cam, target in zip(y_cams, fractions)]
+    calibration.save(path)
+    
+    print(f"✓ Screen mapping written to {path}")
+    return True
+
+
+def main():
+    """Parse arguments and run a calibration step."""
+    parser = argparse.ArgumentParser(description="Calibrate the camera and screen mapping.")
+    parser.add_argument("step", choices=("intrinsics", "region"),
+                        help="intrinsics: lens calibration from a chessboard; "
+                             "region: map the hand range to the screen")
+    parser.add_argument("--source", default=str(config.CAMERA_INDEX),
+                        help="Camera index, video file or image directory")
+    parser.add_argument("--output", default=config.CALIBRATION_PATH,
+                        help="Calibration file to update")
+    parser.add_argument("--board", default="x".join(map(str, config.CALIBRATION_CHESSBOARD)),
+                        help="Inner corners of the chessboard, e.g. 9x6")
+    parser.add_argument("--views", type=int, default=config.CALIBRATION_VIEWS,
+                        help="Chessboard views to capture")
+    args = parser.parse_args()
+    
+    if args.step == "intrinsics":
+        board = tuple(int(n) for n in args.board.lower().split("x"))
+        success = calibrate_intrinsics(args.source, args.output, board, args.views)
+    else:
+        success = calibrate_region(args.source, args.output)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,46 +3,44 @@ Camera handler for capturing and preprocessing webcam frames.
 """
 import cv2
 import config
+from frame_sources import create_frame_source
 
 
 class CameraHandler:
-    """Manages webcam input and frame preprocessing."""
+    """Manages frame input and frame preprocessing."""
     
-    def __init__(self, camera_index=config.CAMERA_INDEX):
+    def __init__(self, camera_index=config.CAMERA_INDEX, source=None, pacing=None):
         """
         Initialize camera handler.
         
         Args:
-            camera_index: Index of camera to use (0 = default)
+            camera_index: Index of camera to use (0 = default), or any
+                specification accepted by create_frame_source (video file,
+                image directory, "synthetic")
+            source: FrameSource to read from instead of camera_index
+            pacing: Pacing mode for a source created from camera_index
         """
         self.camera_index = camera_index
-        self.cap = None
+        self.source = source or create_frame_source(camera_index, pacing)
         self.frame_width = config.CAMERA_WIDTH
         self.frame_height = config.CAMERA_HEIGHT
     
     def start(self):
         """
-        Start camera capture.
+        Start frame capture.
         
         Returns:
-            True if camera started successfully, False otherwise
+            True if the source started successfully, False otherwise
         """
-        self.cap = cv2.VideoCapture(self.camera_index)
-        
-        if not self.cap.isOpened():
-            print(f"Error: Could not open camera {self.camera_index}")
+        if not self.source.open():
             return False
         
-        # Set camera resolution
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_height)
-        self.cap.set(cv2.CAP_PROP_FPS, config.TARGET_FPS)
-        
         # Get actual resolution (may differ from requested)
-        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_width = self.source.width
+        self.frame_height = self.source.height
         
-        print(f"Camera started: {self.frame_width}x{self.frame_height}")
+        print(f"Camera started: {self.frame_width}x{self.frame_height} "
+              f"from {self.source.describe()}")
         return True
     
     def read_frame(self):
@@ -51,15 +49,11 @@ class CameraHandler:
         
         Returns:
             Preprocessed frame (flipped horizontally for mirror effect),
-            or None if capture failed
+            or None if capture failed or the source ended
         """
-        if self.cap is None or not self.cap.isOpened():
-            return None
-        
-        success, frame = self.cap.read()
+        frame = self.source.read()
         
-        if not success:
-            print("Error: Failed to capture frame")
+        if frame is None:
             return None
         
         # Flip horizontally for mirror effect (more intuitive)
@@ -78,6 +72,5 @@ class CameraHandler:
     
     def release(self):
         """Release camera resources."""
-        if self.cap is not None:
-            self.cap.release()
-            print("Camera released")
+        self.source.release()
+        print("Camera released")
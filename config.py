@@ -1,11 +1,17 @@
 """
 Configuration constants and tunable parameters for gesture control application.
+
+Settings listed in TUNABLE_SETTINGS can be overridden by a tuned profile
+written by `python setup.py --probe` (see the end of this file).
 """
+import json
+import os
 
 # Detection thresholds
 PINCH_THRESHOLD = 0.03  # Distance threshold for pinch gestures (normalized 0-1)
 PINCH_RELEASE_THRESHOLD = 0.045  # Distance to release pinch (prevents flickering)
 GESTURE_COOLDOWN = 0.5  # Seconds to wait between gesture triggers
+PINCH_DWELL = 0.0  # Seconds a pinch must be held before it clicks
 
 # Smoothing parameters
 SMOOTHING_FRAMES = 7  # Number of frames to average for cursor smoothing
@@ -15,27 +21,64 @@ CURSOR_SPEED_MULTIPLIER = 1.0  # Cursor movement speed multiplier
 SCROLL_THRESHOLD = 0.02  # Minimum vertical movement to trigger scroll
 SCROLL_MULTIPLIER = 10  # Scroll distance multiplier
 SCROLL_SMOOTHING_FRAMES = 3  # Number of frames for scroll smoothing
+SCROLL_MAX_EVENTS_PER_SECOND = 20  # Scroll deltas are coalesced to at most this rate
+SCROLL_HIGH_RESOLUTION = True  # Send fractional wheel deltas where the OS supports it
+SCROLL_MOMENTUM = True  # Keep scrolling briefly after the fingers lift
+SCROLL_MOMENTUM_DECAY = 4.0  # Momentum decay per second (higher = stops sooner)
+SCROLL_MOMENTUM_MIN_VELOCITY = 0.5  # Momentum stops below this speed (clicks/second)
+SCROLL_MOMENTUM_WINDOW = 0.15  # Seconds held still before lifting cancels momentum
 
 # Camera settings
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 TARGET_FPS = 30
 CAMERA_INDEX = 0  # Default camera (0 = first camera)
+CAMERA_BUFFER_SIZE = 1  # Driver frame queue (1 = always newest frame, None = default)
+CAMERA_FOURCC = "MJPG"  # Pixel format to request (MJPG allows higher FPS over USB)
+FRAME_PACING = "realtime"  # "realtime" (recorded/target FPS) or "unthrottled"
+
+# Batch processing
+BATCH_OUTPUT_DIR = "landmark_dataset"  # Default output directory for batch runs
+BATCH_MANIFEST_NAME = "manifest.json"  # Manifest written next to landmark files
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
 
 # MediaPipe settings
 MAX_NUM_HANDS = 1  # Track only one hand for simplicity
 MIN_DETECTION_CONFIDENCE = 0.7  # Minimum confidence for hand detection
 MIN_TRACKING_CONFIDENCE = 0.5  # Minimum confidence for hand tracking
+MODEL_COMPLEXITY = 1  # Hand landmark model: 0 = lite (faster), 1 = full (more accurate)
+HAND_TRACKER_BACKEND = "solutions"  # "solutions" (blocking) or "tasks" (async LIVE_STREAM)
+HAND_LANDMARKER_MODEL_PATH = "hand_landmarker.task"  # Model bundle for the tasks backend
+HAND_LANDMARKER_DELEGATE = "cpu"  # Tasks inference delegate: "cpu" or "gpu"
 
 # Visual feedback
 SHOW_LANDMARKS = True  # Draw hand landmarks on video feed
 SHOW_FPS = True  # Show FPS counter
 LANDMARK_DRAW_COLOR = (0, 255, 0)  # Green color for landmarks (BGR)
 CONNECTION_DRAW_COLOR = (255, 0, 0)  # Blue color for connections (BGR)
+LANDMARK_DRAW_RADIUS = 4  # Joint radius in pixels
+CONNECTION_DRAW_THICKNESS = 2  # Connection line thickness in pixels
+HUD_WIDTH = 320  # Size of the cached text HUD area (top-left corner)
+HUD_HEIGHT = 125
+
+# Profiling
+PROFILE_FRAMES = 300  # Frames profiled by --profile when no limit is given
+PROFILE_SAMPLE_INTERVAL = 0.001  # Seconds between stack samples (--profile sample)
+PROFILE_REPORT_PATH = "profile_report.txt"
+
+# Flight recorder (recent history dumped on stalls, failsafe or SIGUSR1)
+FLIGHT_RECORDER_ENABLED = True
+FLIGHT_RECORDER_SECONDS = 5  # Seconds of history kept in memory
+FLIGHT_RECORDER_FRAME_SIZE = (160, 120)  # Frames are downscaled to this size
+FLIGHT_RECORDER_LATENCY_THRESHOLD = 0.1  # Seconds a single stage may take
+FLIGHT_RECORDER_DUMP_COOLDOWN = 10.0  # Minimum seconds between latency dumps
+FLIGHT_RECORDER_DIR = "flight_recordings"
 
 # Safety features
 ENABLE_FAILSAFE = True  # PyAutoGUI failsafe (move to corner to stop)
 SCREEN_BOUNDARY_MARGIN = 10  # Pixels margin from screen edge
+NO_CONTROL_SCREEN_SIZE = (1920, 1080)  # Screen assumed with --no-control (no display needed)
 
 # Gesture state
 STATE_IDLE = "idle"
@@ -44,6 +87,36 @@ STATE_LEFT_CLICKING = "left_clicking"
 STATE_RIGHT_CLICKING = "right_clicking"
 STATE_SCROLLING = "scrolling"
 
+# Gesture state machine. Rows leaving the same state are checked in order
+# and the first one that holds fires. "when" is (feature, operator,
+# threshold); features are hand, left_distance, right_distance, two_fingers.
+# Pinches use a tighter threshold to enter than to leave (hysteresis), so a
+# pinch clicks once and re-arms only after the fingers open again.
+GESTURE_TRANSITIONS = (
+    {"from": STATE_IDLE, "to": STATE_HOVERING, "when": ("hand", ">", 0.5)},
+    
+    {"from": STATE_HOVERING, "to": STATE_LEFT_CLICKING,
+     "when": ("left_distance", "<", PINCH_THRESHOLD),
+     "dwell": PINCH_DWELL, "cooldown": GESTURE_COOLDOWN, "emit": "left_click"},
+    {"from": STATE_HOVERING, "to": STATE_RIGHT_CLICKING,
+     "when": ("right_distance", "<", PINCH_THRESHOLD),
+     "dwell": PINCH_DWELL, "cooldown": GESTURE_COOLDOWN, "emit": "right_click"},
+    {"from": STATE_HOVERING, "to": STATE_SCROLLING, "when": ("two_fingers", ">", 0.5)},
+    
+    {"from": STATE_SCROLLING, "to": STATE_LEFT_CLICKING,
+     "when": ("left_distance", "<", PINCH_THRESHOLD),
+     "dwell": PINCH_DWELL, "cooldown": GESTURE_COOLDOWN, "emit": "left_click"},
+    {"from": STATE_SCROLLING, "to": STATE_RIGHT_CLICKING,
+     "when": ("right_distance", "<", PINCH_THRESHOLD),
+     "dwell": PINCH_DWELL, "cooldown": GESTURE_COOLDOWN, "emit": "right_click"},
+    {"from": STATE_SCROLLING, "to": STATE_HOVERING, "when": ("two_fingers", "<", 0.5)},
+    
+    {"from": STATE_LEFT_CLICKING, "to": STATE_HOVERING,
+     "when": ("left_distance", ">", PINCH_RELEASE_THRESHOLD)},
+    {"from": STATE_RIGHT_CLICKING, "to": STATE_HOVERING,
+     "when": ("right_distance", ">", PINCH_RELEASE_THRESHOLD)},
+)
+
 # Hand landmarks (MediaPipe indices)
 THUMB_TIP = 4
 INDEX_TIP = 8
@@ -53,3 +126,73 @@ MIDDLE_PIP = 10
 RING_TIP = 16
 PINKY_TIP = 20
 WRIST = 0
+
+# Tracking mode
+TRACKING_MODE = "inference"  # "inference" (MediaPipe every frame) or "flow" (optical flow between inferences)
+FLOW_KEY_LANDMARKS = (WRIST, THUMB_TIP, INDEX_PIP, INDEX_TIP, MIDDLE_PIP, MIDDLE_TIP)
+FLOW_MAX_TRACKED_FRAMES = 4  # Frames tracked by optical flow before a forced inference
+FLOW_MAX_FB_ERROR = 1.5  # Largest forward-backward tracking error accepted (pixels)
+FLOW_WINDOW_SIZE = 21  # Lucas-Kanade window size (pixels)
+FLOW_PYRAMID_LEVELS = 3  # Image pyramid levels for larger motions
+
+# Hardware probe (python setup.py --probe)
+PROBE_RESOLUTIONS = ((320, 240), (640, 480), (960, 540), (1280, 720))
+PROBE_MODEL_COMPLEXITIES = (0, 1)
+PROBE_FRAMES = 60  # Frames measured per resolution / model
+PROBE_MIN_FPS = 24  # Slowest pipeline rate the probe will accept as smooth
+PROBE_FPS_STEPS = (15, 20, 24, 30, 60)  # TARGET_FPS values the probe picks from
+SMOOTHING_WINDOW_SECONDS = 0.23  # Cursor smoothing window the probe preserves
+
+# Calibration (python calibration.py intrinsics / region)
+CALIBRATION_PATH = os.environ.get(
+    "GESTURE_CALIBRATION",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json"))
+CALIBRATION_CHESSBOARD = (9, 6)  # Inner corners (columns, rows) of the printed board
+CALIBRATION_VIEWS = 20  # Chessboard views captured for the lens intrinsics
+CALIBRATION_MIN_VIEWS = 8  # Fewest views accepted
+CALIBRATION_CAPTURE_INTERVAL = 1.0  # Seconds between live chessboard captures
+CALIBRATION_TARGETS = (0.05, 0.5, 0.95)  # Screen fractions of the 3x3 pointing targets
+CALIBRATION_HOLD_FRAMES = 15  # Fingertip positions averaged per target
+CALIBRATION_LUT_SIZE = 1024  # Entries per axis of the camera-to-screen lookup table
+CALIBRATION_LUT_RANGE = (-0.25, 1.25)  # Normalized camera range the table covers
+
+# Tuned profile
+CONFIG_PROFILE_PATH = os.environ.get(
+    "GESTURE_CONFIG_PROFILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_profile.json"))
+# Integer settings a profile may override, with their (minimum, maximum)
+TUNABLE_SETTINGS = {
+    "CAMERA_WIDTH": (1, None),
+    "CAMERA_HEIGHT": (1, None),
+    "TARGET_FPS": (1, None),
+    "SMOOTHING_FRAMES": (1, None),
+    "MODEL_COMPLEXITY": (0, 1),
+}
+
+
+def _load_profile(path):
+    """Override tunable settings from a tuned profile, if one exists."""
+    if not os.path.exists(path):
+        return
+    
+    try:
+        with open(path) as f:
+            settings = json.load(f).get("settings", {})
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring config profile {path}: {e}")
+        return
+    
+    for name, (minimum, maximum) in TUNABLE_SETTINGS.items():
+        if name not in settings:
+            continue
+        value = settings[name]
+        # bool is an int subclass, so it is rejected explicitly
+        valid = (isinstance(value, int) and not isinstance(value, bool) and
+                 value >= minimum and (maximum is None or value <= maximum))
+        if not valid:
+            print(f"Warning: Ignoring {name}={value!r} in config profile {path}")
+            continue
+        globals()[name] = value
+
+
+_load_profile(CONFIG_PROFILE_PATH)
@@ -0,0 +1,221 @@
+"""
+In-memory flight recorder for diagnosing misfires and stalls.
+
+Keeps the last few seconds of per-frame data in preallocated ring buffers
+(downscaled frames, landmarks, recognizer state, emitted gestures and stage
+timings) and writes them to disk when a stage exceeds its latency budget,
+when the PyAutoGUI failsafe triggers, or when a signal requests it.
+"""
+import os
+import signal
+import threading
+import time
+import cv2
+import numpy as np
+import config
+from profiler import STAGE_NAMES
+from utils import landmarks_to_array
+
+NUM_LANDMARKS = 21
+
+# Recognizer states stored as small integer codes
+STATES = (config.STATE_IDLE, config.STATE_HOVERING, config.STATE_LEFT_CLICKING,
+          config.STATE_RIGHT_CLICKING, config.STATE_SCROLLING)
+_STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+
+class FlightRecorder:
+    """Bounded ring buffer of recent frames, dumped to disk on demand."""
+    
+    def __init__(self, seconds=config.FLIGHT_RECORDER_SECONDS, fps=config.TARGET_FPS,
+                 frame_size=config.FLIGHT_RECORDER_FRAME_SIZE,
+                 output_dir=config.FLIGHT_RECORDER_DIR,
+                 latency_threshold=config.FLIGHT_RECORDER_LATENCY_THRESHOLD,
+                 dump_cooldown=config.FLIGHT_RECORDER_DUMP_COOLDOWN):
+        """
+        Initialize flight recorder. All memory is allocated here.
+        
+        Args:
+            seconds: Seconds of history to keep
+            fps: Expected frame rate, used to size the buffers
+            frame_size: (width, height) frames are downscaled to
+            output_dir: Directory dumps are written to
+            latency_threshold: Seconds any single stage may take before a
+                dump is triggered (None disables latency dumps)
+            dump_cooldown: Minimum seconds between automatic dumps
+        """
+        self.capacity = max(int(seconds * fps), 1)
+        self.frame_size = tuple(frame_size)
+        self.output_dir = output_dir
+        self.latency_threshold = latency_threshold
+        self.dump_cooldown = dump_cooldown
+        
+        width, height = self.frame_size
+        self.frames = np.zeros((self.capacity, height, width, 3), dtype=np.uint8)
+        self.landmarks = np.zeros((self.capacity, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.has_hand = np.zeros(self.capacity, dtype=bool)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.states = np.zeros(self.capacity, dtype=np.int8)
+        self.cursor = np.zeros((self.capacity, 2), dtype=np.float32)
+        self.left_click = np.zeros(self.capacity, dtype=bool)
+        self.right_click = np.zeros(self.capacity, dtype=bool)
+        self.scroll = np.zeros(self.capacity, dtype=np.float32)
+        self.timings = np.zeros((self.capacity, len(STAGE_NAMES)), dtype=np.float32)
+        
+        self.index = 0
+        self.count = 0
+        self.dump_requested = None
+        self._last_dump_time = -float("inf")
+        self._writer = None
+        
+        print(f"Flight recorder: {self.capacity} frames, "
+              f"{self.memory_bytes() / (1024 * 1024):.1f} MiB")
+    
+    def memory_bytes(self):
+        """Total size of the ring buffers in bytes."""
+        return sum(array.nbytes for array in (
+            self.frames, self.landmarks, self.has_hand, self.timestamps, self.states,
+            self.cursor, self.left_click, self.right_click, self.scroll, self.timings))
+    
+    def install_signal_handler(self):
+        """
+        Dump on SIGUSR1 (POSIX) or Ctrl+Break (Windows).
+        
+        The handler only sets a flag; the dump happens on the next record().
+        
+        Returns:
+            Name of the signal installed, or None if none is available
+        """
+        signum = getattr(signal, "SIGUSR1", None) or getattr(signal, "SIGBREAK", None)
+        if signum is None:
+            return None
+        
+        def handler(received, stack):
+            self.dump_requested = "signal"
+        
+        signal.signal(signum, handler)
+        return signal.Signals(signum).name
+    
+    def record(self, frame, landmarks, state, gestures, durations, timestamp):
+        """
+        Record one frame. Called once per frame after all stages ran.
+        
+        Args:
+            frame: BGR frame (downscaled into the buffer)
+            landmarks: List of hand landmarks, or None
+            state: Recognizer state string
+            gestures: GestureResult emitted this frame
+            durations: Per-stage durations in seconds (StageTimer.durations)
+            timestamp: Monotonic timestamp of the frame
+        """
+        i = self.index
+        cv2.resize(frame, self.frame_size, dst=self.frames[i],
+                   interpolation=cv2.INTER_NEAREST)
+        
+        if landmarks is not None:
+            landmarks_to_array(landmarks, out=self.landmarks[i])
+            self.has_hand[i] = True
+        else:
+            self.has_hand[i] = False
+        
+        self.timestamps[i] = timestamp
+        self.states[i] = _STATE_CODES.get(state, -1)
+        self.cursor[i, 0] = gestures.cursor_x
+        self.cursor[i, 1] = gestures.cursor_y
+        self.left_click[i] = gestures.left_click
+        self.right_click[i] = gestures.right_click
+        self.scroll[i] = gestures.scroll if gestures.scroll is not None else 0.0
+        self.timings[i] = durations
+        
+        self.index = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        
+        if self.dump_requested is not None:
+            reason = self.dump_requested
+            self.dump_requested = None
+            self.dump(reason)
+        elif self.latency_threshold is not None and self.count == self.capacity:
+            # Start-up (model loading, camera warm-up) is slow by design, so
+            # latency dumps only start once the buffer has filled
+            slowest = max(durations)
+            if (slowest > self.latency_threshold and not self.writing() and
+                    timestamp - self._last_dump_time >= self.dump_cooldown):
+                stage = STAGE_NAMES[durations.index(slowest)]
+                self.dump(f"latency_{stage}")
+    
+    def dump(self, reason):
+        """
+        Write the buffered history to disk in the background.
+        
+        The buffers are copied in chronological order first, so recording
+        continues while the file is written. If a previous dump is still
+        being written, the dump is deferred to the next record() (or to
+        wait()) instead of blocking the caller.
+        
+        Args:
+            reason: Short label included in the file name
+        
+        Returns:
+            Path of the file being written, or None if nothing is recorded
+            or the dump was deferred
+        """
+        if self.count == 0:
+            return None
+        
+        # Only one dump is written at a time
+        if self.writing():
+            if self.dump_requested is None:
+                self.dump_requested = reason
+            return None
+        
+        self._last_dump_time = time.monotonic()
+        order = (np.arange(self.count) + self.index - self.count) % self.capacity
+        snapshot = {
+            "frames": self.frames[order],
+            "landmarks": self.landmarks[order],
+            "has_hand": self.has_hand[order],
+            "timestamps": self.timestamps[order],
+            "states": self.states[order],
+            "state_names": np.array(STATES),
+            "cursor": self.cursor[order],
+            "left_click": self.left_click[order],
+            "right_click": self.right_click[order],
+            "scroll": self.scroll[order],
+            "timings": self.timings[order],
+            "stage_names": np.array(STAGE_NAMES),
+            "reason": np.array(reason),
+        }
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = time.strftime("flight_%Y%m%d_%H%M%S") + f"_{reason}.npz"
+        path = os.path.join(self.output_dir, name)
+        
+        self._writer = threading.Thread(target=self._write, args=(path, snapshot),
+                                        name="flight-recorder-dump")
+        self._writer.start()
+        print(f"Flight recorder: dumping {self.count} frames to {path} ({reason})")
+        return path
+    
+    def _write(self, path, snapshot):
+        """Write a snapshot to disk (runs on the writer thread)."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(f, **snapshot)
+        os.replace(temp_path, path)
+    
+    def writing(self):
+        """True while a dump is being written."""
+        return self._writer is not None and self._writer.is_alive()
+    
+    def wait(self):
+        """Wait for dumps in progress, and any deferred dump, to finish writing."""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        
+        if self.dump_requested is not None:
+            reason = self.dump_requested
+            self.dump_requested = None
+            if self.dump(reason) is not None:
+                self.wait()
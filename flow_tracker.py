@@ -0,0 +1,179 @@
+"""
+Optical-flow landmark tracking between MediaPipe inferences.
+
+The recognizer only reads a handful of landmarks (FLOW_KEY_LANDMARKS). Those
+are tracked from frame to frame with pyramidal Lucas-Kanade optical flow, and
+a full MediaPipe pass runs only when tracking fails the forward-backward
+check, loses a point, or has run for FLOW_MAX_TRACKED_FRAMES frames.
+"""
+import cv2
+import numpy as np
+import config
+from hand_tracker import TasksHandTracker
+from overlay import OverlayRenderer, NUM_LANDMARKS
+from utils import Landmark, landmarks_to_array
+
+TRACKING_INFERENCE = "inference"
+TRACKING_FLOW = "flow"
+TRACKING_MODES = (TRACKING_INFERENCE, TRACKING_FLOW)
+
+
+class FlowTracker:
+    """
+    Hand tracker wrapper that replaces most inferences with optical flow.
+    
+    Has the same process_frame / get_landmarks / draw_landmarks / release
+    contract as HandTracker. The wrapped tracker must be synchronous: its
+    landmarks have to belong to the frame that was passed in.
+    """
+    
+    def __init__(self, tracker, key_landmarks=config.FLOW_KEY_LANDMARKS,
+                 max_tracked_frames=config.FLOW_MAX_TRACKED_FRAMES,
+                 max_fb_error=config.FLOW_MAX_FB_ERROR,
+                 window_size=config.FLOW_WINDOW_SIZE,
+                 pyramid_levels=config.FLOW_PYRAMID_LEVELS):
+        """
+        Initialize flow tracker.
+        
+        Args:
+            tracker: Synchronous hand tracker (HandTracker) used for inference
+            key_landmarks: Landmark indices tracked with optical flow
+            max_tracked_frames: Frames tracked by flow before forcing inference
+            max_fb_error: Largest forward-backward error in pixels accepted
+            window_size: Lucas-Kanade search window size in pixels
+            pyramid_levels: Pyramid levels above the full-resolution image
+        """
+        if isinstance(tracker, TasksHandTracker):
+            raise ValueError("Flow tracking needs a synchronous hand tracker backend")
+        
+        self.tracker = tracker
+        self.key_landmarks = np.array(key_landmarks, dtype=np.intp)
+        self.max_tracked_frames = max_tracked_frames
+        self.max_fb_error = max_fb_error
+        self.window = (window_size, window_size)
+        self.pyramid_levels = pyramid_levels
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+        
+        self.overlay = OverlayRenderer()
+        self._landmarks = [Landmark() for _ in range(NUM_LANDMARKS)]
+        self._array = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._pixels = np.zeros((NUM_LANDMARKS, 2), dtype=np.float32)
+        self._prev_gray = None
+        self.has_hand = False
+        self.tracked_frames = 0
+        
+        # Counters for benchmarks and the HUD
+        self.inference_count = 0
+        self.flow_count = 0
+        
+        print("Flow tracker initialized")
+    
+    def process_frame(self, frame):
+        """
+        Track the hand in a frame, with optical flow when possible.
+        
+        Args:
+            frame: BGR frame from camera
+        
+        Returns:
+            List of normalized landmarks, or None if no hand is tracked. The
+            same list is returned (and overwritten) on every call.
+        """
+        height, width = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        tracked = (self.has_hand and self._prev_gray is not None and
+                   self.tracked_frames < self.max_tracked_frames and
+                   self._track(gray, width, height))
+        if tracked:
+            self.tracked_frames += 1
+            self.flow_count += 1
+        else:
+            self._infer(frame, width, height)
+        
+        self._prev_gray = gray
+        
+        return self._landmarks if self.has_hand else None
+    
+    def _infer(self, frame, width, height):
+        """Run a full inference and restart tracking from its landmarks."""
+        results = self.tracker.process_frame(frame)
+        landmarks = self.tracker.get_landmarks(results)
+        self.inference_count += 1
+        self.tracked_frames = 0
+        self.has_hand = landmarks is not None
+        if not self.has_hand:
+            return
+        
+        landmarks_to_array(landmarks, out=self._array)
+        self._pixels[:, 0] = self._array[:, 0] * width
+        self._pixels[:, 1] = self._array[:, 1] * height
+        self._write_landmarks(width, height)
+    
+    def _track(self, gray, width, height):
+        """
+        Move the landmarks with optical flow from the previous frame.
+        
+        Returns:
+            True if every key point passed the forward-backward check
+        """
+        previous = self._pixels[self.key_landmarks].reshape(-1, 1, 2)
+        forward, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, gray, previous, None, winSize=self.window,
+            maxLevel=self.pyramid_levels, criteria=self.criteria)
+        backward, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._prev_gray, forward, None, winSize=self.window,
+            maxLevel=self.pyramid_levels, criteria=self.criteria)
+        
+        if not (status.all() and back_status.all()):
+            return False
+        fb_error = np.sqrt(((previous - backward) ** 2).sum(axis=2))
+        if fb_error.max() > self.max_fb_error:
+            return False
+        
+        # Untracked landmarks follow the average motion of the key points
+        moved = forward.reshape(-1, 2)
+        self._pixels += (moved - previous.reshape(-1, 2)).mean(axis=0)
+        self._pixels[self.key_landmarks] = moved
+        self._write_landmarks(width, height)
+        return True
+    
+    def _write_landmarks(self, width, height):
+        """Update the returned landmark objects from the pixel positions."""
+        self._array[:, 0] = self._pixels[:, 0] / width
+        self._array[:, 1] = self._pixels[:, 1] / height
+        for (x, y, z), landmark in zip(self._array.tolist(), self._landmarks):
+            landmark.x = x
+            landmark.y = y
+            landmark.z = z
+    
+    def get_landmarks(self, results):
+        """
+        Extract hand landmarks from results.
+        
+        Args:
+            results: Value returned by process_frame
+        
+        Returns:
+            List of normalized landmarks (0-1 range), or None if no hands detected
+        """
+        return results
+    
+    def draw_landmarks(self, frame, results):
+        """
+        Draw hand landmarks on frame for visual feedback.
+        
+        Args:
+            frame: Frame to draw on
+            results: Value returned by process_frame
+        
+        Returns:
+            Frame with landmarks drawn
+        """
+        if config.SHOW_LANDMARKS and results is not None:
+            self.overlay.draw_hand(frame, self._array)
+        return frame
+    
+    def release(self):
+        """Release the wrapped tracker."""
+        self.tracker.release()
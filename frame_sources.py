@@ -0,0 +1,370 @@
+"""
+Frame sources for CameraHandler: webcam, video file, image sequence and a
+synthetic generator.
+
+Every source supports two pacing modes:
+    realtime    - frames are delivered at the recorded or target FPS
+    unthrottled - frames are delivered as fast as they can be produced
+"""
+import os
+import time
+import cv2
+import numpy as np
+import config
+
+PACING_REALTIME = "realtime"
+PACING_UNTHROTTLED = "unthrottled"
+PACING_MODES = (PACING_REALTIME, PACING_UNTHROTTLED)
+
+
+class Pacer:
+    """Sleeps between frames to hold a target frame rate."""
+    
+    __slots__ = ("interval", "enabled", "next_time")
+    
+    def __init__(self, fps, pacing=PACING_REALTIME):
+        """
+        Initialize pacer.
+        
+        Args:
+            fps: Target frames per second
+            pacing: PACING_REALTIME or PACING_UNTHROTTLED
+        """
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {pacing}")
+        
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.enabled = pacing == PACING_REALTIME and self.interval > 0
+        self.next_time = None
+    
+    def wait(self):
+        """Block until the next frame is due (no-op when unthrottled)."""
+        if not self.enabled:
+            return
+        
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        elif now < self.next_time:
+            time.sleep(self.next_time - now)
+        elif now - self.next_time > self.interval:
+            # Fell behind by more than a frame, do not try to catch up
+            self.next_time = now
+        
+        self.next_time += self.interval
+    
+    def reset(self):
+        """Restart pacing from the next frame."""
+        self.next_time = None
+
+
+class FrameSource:
+    """Base class for frame sources used by CameraHandler."""
+    
+    def __init__(self, fps, pacing):
+        self.fps = fps
+        self.pacing = pacing
+        self.width = 0
+        self.height = 0
+        self.frame_index = -1
+        self.pacer = Pacer(fps, pacing)
+    
+    @property
+    def position(self):
+        """Timestamp of the last frame in seconds from the start of the source."""
+        return self.frame_index / self.fps if self.fps else 0.0
+    
+    def open(self):
+        """
+        Open the source.
+        
+        Returns:
+            True if the source opened successfully, False otherwise
+        """
+        raise NotImplementedError
+    
+    def read(self):
+        """
+        Read the next frame, waiting for it if pacing is realtime.
+        
+        Returns:
+            BGR frame, or None at the end of the source or on failure
+        """
+        self.pacer.wait()
+        frame = self._read()
+        if frame is not None:
+            self.frame_index += 1
+        return frame
+    
+    def _read(self):
+        raise NotImplementedError
+    
+    def release(self):
+        """Release the source."""
+    
+    def describe(self):
+        """Short human-readable description of the source."""
+        return type(self).__name__
+
+
+class WebcamSource(FrameSource):
+    """Live camera through cv2.VideoCapture."""
+    
+    def __init__(self, camera_index=config.CAMERA_INDEX, width=config.CAMERA_WIDTH,
+                 height=config.CAMERA_HEIGHT, fps=config.TARGET_FPS,
+                 pacing=config.FRAME_PACING, buffer_size=config.CAMERA_BUFFER_SIZE,
+                 fourcc=config.CAMERA_FOURCC):
+        """
+        Initialize webcam source.
+        
+        Args:
+            camera_index: Index of camera to use (0 = default)
+            width: Requested frame width
+            height: Requested frame height
+            fps: Requested (and, in realtime pacing, maximum) frames per second
+            pacing: PACING_REALTIME or PACING_UNTHROTTLED
+            buffer_size: Driver frame queue length (1 = always newest frame),
+                or None to keep the driver default
+            fourcc: Pixel format to negotiate, e.g. "MJPG", or None
+        """
+        super().__init__(fps, pacing)
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.buffer_size = buffer_size
+        self.fourcc = fourcc
+        self.cap = None
+    
+    def open(self):
+        self.cap = cv2.VideoCapture(self.camera_index)
+        
+        if not self.cap.isOpened():
+            print(f"Error: Could not open camera {self.camera_index}")
+            return False
+        
+        # Pixel format must be negotiated before the resolution
+        if self.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.buffer_size is not None:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        
+        # Set camera resolution
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        
+        # Get actual settings (may differ from requested)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or self.fps
+        return True
+    
+    def negotiated_fourcc(self):
+        """
+        Get the pixel format the camera actually delivers.
+        
+        Returns:
+            Four-character code string, or None if unknown
+        """
+        if self.cap is None:
+            return None
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        if code <= 0:
+            return None
+        return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    
+    def _read(self):
+        if self.cap is None or not self.cap.isOpened():
+            return None
+        
+        success, frame = self.cap.read()
+        if not success:
+            print("Error: Failed to capture frame")
+            return None
+        return frame
+    
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def describe(self):
+        fourcc = self.negotiated_fourcc() or "default"
+        return f"camera {self.camera_index} ({fourcc}, buffer {self.buffer_size})"
+
+
+class VideoFileSource(FrameSource):
+    """Recorded video file."""
+    
+    def __init__(self, path, pacing=config.FRAME_PACING, loop=False):
+        """
+        Initialize video file source.
+        
+        Args:
+            path: Path of the video file
+            pacing: PACING_REALTIME (recorded FPS) or PACING_UNTHROTTLED
+            loop: Restart from the beginning at the end of the file
+        """
+        super().__init__(0, pacing)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+    
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            print(f"Error: Could not open video {self.path}")
+            return False
+        
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or config.TARGET_FPS
+        self.pacer = Pacer(self.fps, self.pacing)
+        return True
+    
+    def _read(self):
+        if self.cap is None:
+            return None
+        
+        success, frame = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read()
+        return frame if success else None
+    
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
+    def describe(self):
+        return f"video {self.path}"
+
+
+class ImageSequenceSource(FrameSource):
+    """Directory of images read in sorted filename order."""
+    
+    def __init__(self, directory, fps=config.TARGET_FPS, pacing=config.FRAME_PACING,
+                 loop=False):
+        """
+        Initialize image sequence source.
+        
+        Args:
+            directory: Directory containing the images
+            fps: Frame rate of the sequence
+            pacing: PACING_REALTIME or PACING_UNTHROTTLED
+            loop: Restart from the first image after the last one
+        """
+        super().__init__(fps, pacing)
+        self.directory = directory
+        self.loop = loop
+        self.paths = []
+        self._next = 0
+    
+    def open(self):
+        self.paths = [
+            os.path.join(self.directory, name)
+            for name in sorted(os.listdir(self.directory))
+            if os.path.splitext(name)[1].lower() in config.IMAGE_EXTENSIONS
+        ]
+        if not self.paths:
+            print(f"Error: No images found in {self.directory}")
+            return False
+        
+        first = cv2.imread(self.paths[0])
+        if first is None:
+            print(f"Error: Could not read {self.paths[0]}")
+            return False
+        self.height, self.width = first.shape[:2]
+        self._next = 0
+        return True
+    
+    def _read(self):
+        while True:
+            if self._next >= len(self.paths):
+                if not self.loop:
+                    return None
+                self._next = 0
+            
+            path = self.paths[self._next]
+            self._next += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return frame
+            print(f"Warning: Skipping unreadable image {path}")
+    
+    def describe(self):
+        return f"image sequence {self.directory} ({len(self.paths)} frames)"
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames for hardware-free throughput runs."""
+    
+    def __init__(self, width=config.CAMERA_WIDTH, height=config.CAMERA_HEIGHT,
+                 fps=config.TARGET_FPS, pacing=config.FRAME_PACING, num_frames=None,
+                 seed=0):
+        """
+        Initialize synthetic source.
+        
+        Frames are a fixed noise background with a moving bright disc, so
+        every frame differs while generation stays cheap and deterministic.
+        
+        Args:
+            width: Frame width
+            height: Frame height
+            fps: Frame rate used for realtime pacing
+            pacing: PACING_REALTIME or PACING_UNTHROTTLED
+            num_frames: Number of frames before the source ends (None = endless)
+            seed: Seed for the background noise
+        """
+        super().__init__(fps, pacing)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.seed = seed
+        self._background = None
+    
+    def open(self):
+        rng = np.random.default_rng(self.seed)
+        self._background = rng.integers(
+            0, 64, size=(self.height, self.width, 3), dtype=np.uint8)
+        return True
+    
+    def _read(self):
+        index = self.frame_index + 1
+        if self.num_frames is not None and index >= self.num_frames:
+            return None
+        
+        frame = self._background.copy()
+        t = index / self.fps
+        center = (int(self.width * (0.5 + 0.3 * np.sin(t))),
+                  int(self.height * (0.5 + 0.3 * np.cos(t * 0.7))))
+        cv2.circle(frame, center, max(self.height // 10, 1), (200, 180, 160), -1)
+        return frame
+    
+    def describe(self):
+        return f"synthetic {self.width}x{self.height}"
+
+
+def create_frame_source(spec=config.CAMERA_INDEX, pacing=None):
+    """
+    Create a frame source from a command line style specification.
+    
+    Args:
+        spec: Camera index (int or digit string), "synthetic", a directory of
+            images or a video file path
+        pacing: PACING_REALTIME or PACING_UNTHROTTLED (default: config.FRAME_PACING)
+    
+    Returns:
+        FrameSource instance (not yet opened)
+    """
+    if pacing is None:
+        pacing = config.FRAME_PACING
+    
+    if isinstance(spec, int) or str(spec).isdigit():
+        return WebcamSource(int(spec), pacing=pacing)
+    if spec == "synthetic":
+        return SyntheticSource(pacing=pacing)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, pacing=pacing)
+    return VideoFileSource(spec, pacing=pacing)
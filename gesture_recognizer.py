@@ -2,64 +2,100 @@
 Gesture recognition logic for detecting and interpreting hand gestures.
 """
 import time
+import numpy as np
 import config
-from utils import calculate_distance, normalize_to_screen, SmoothingBuffer, CooldownTimer, is_finger_extended
+from gesture_state_machine import (GestureStateMachine, FEATURE_HAND, FEATURE_LEFT_DISTANCE,
+                                   FEATURE_RIGHT_DISTANCE, FEATURE_TWO_FINGERS)
+from utils import calculate_distance, normalize_to_screen, SmoothingBuffer, is_finger_extended
+
+
+class GestureResult:
+    """
+    Gestures recognized in one frame.
+    
+    The recognizer reuses a single instance for every frame, so callers must
+    read the fields before the next call to recognize().
+    """
+    
+    __slots__ = ("has_cursor", "cursor_x", "cursor_y",
+                 "left_click", "right_click", "scroll", "scroll_active")
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        """Reset to the no-gesture state."""
+        self.has_cursor = False
+        self.cursor_x = 0.0
+        self.cursor_y = 0.0
+        self.left_click = False
+        self.right_click = False
+        self.scroll = None
+        self.scroll_active = False
 
 
 class GestureRecognizer:
     """Recognizes gestures from hand landmarks and manages gesture state."""
     
-    def __init__(self, frame_width, frame_height):
+    def __init__(self, frame_width, frame_height, screen_size=None, verbose=True,
+                 lut=None):
         """
         Initialize gesture recognizer.
         
         Args:
             frame_width: Width of camera frame
             frame_height: Height of camera frame
+            screen_size: (width, height) of the screen (default: query PyAutoGUI)
+            verbose: Print a message when initialized
+            lut: Optional calibrated ScreenLUT for the cursor mapping
         """
         self.frame_width = frame_width
         self.frame_height = frame_height
+        if screen_size is None:
+            import pyautogui
+            screen_size = pyautogui.size()
+        self.screen_size = tuple(screen_size)
+        self.lut = lut
         
         # Smoothing buffers
         self.cursor_buffer = SmoothingBuffer(config.SMOOTHING_FRAMES)
         self.scroll_buffer = SmoothingBuffer(config.SCROLL_SMOOTHING_FRAMES)
         
-        # Cooldown timers
-        self.left_click_cooldown = CooldownTimer(config.GESTURE_COOLDOWN)
-        self.right_click_cooldown = CooldownTimer(config.GESTURE_COOLDOWN)
-        
-        # Gesture state
-        self.current_state = config.STATE_IDLE
+        # Gesture state, transitions, dwell times and cooldowns (config table)
+        self.state_machine = GestureStateMachine(config.GESTURE_TRANSITIONS)
         self.previous_scroll_y = None
         
-        print("Gesture recognizer initialized")
+        # Reused for every frame so the steady state does not allocate
+        self.result = GestureResult()
+        
+        # Independent recognizer state per stream for recognize_batch
+        self.streams = {}
+        
+        if verbose:
+            print("Gesture recognizer initialized")
     
-    def recognize(self, landmarks):
+    def recognize(self, landmarks, timestamp=None):
         """
         Recognize gestures from hand landmarks.
         
         Args:
             landmarks: List of MediaPipe hand landmarks
+            timestamp: Monotonic time of the frame in seconds, used for all
+                timing in this frame (default: read the clock once)
         
         Returns:
-            Dictionary containing recognized gestures and actions:
-            {
-                'cursor_pos': (x, y) or None,
-                'left_click': True/False,
-                'right_click': True/False,
-                'scroll': amount or None
-            }
+            GestureResult with the recognized gestures and actions. The same
+            object is returned (and overwritten) on every call.
         """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        
         if landmarks is None:
             self.cursor_buffer.clear()
             self.previous_scroll_y = None
-            self.current_state = config.STATE_IDLE
-            return {
-                'cursor_pos': None,
-                'left_click': False,
-                'right_click': False,
-                'scroll': None
-            }
+            self.state_machine.reset()
+            self.result.clear()
+            return self.result
         
         # Extract key landmarks
         thumb_tip = landmarks[config.THUMB_TIP]
@@ -69,143 +105,221 @@ class GestureRecognizer:
         middle_pip = landmarks[config.MIDDLE_PIP]
         wrist = landmarks[config.WRIST]
         
-        # Initialize result
-        result = {
-            'cursor_pos': None,
-            'left_click': False,
-            'right_click': False,
-            'scroll': None
-        }
-        
-        # 1. Cursor movement (always based on index finger tip)
-        cursor_x, cursor_y = self._recognize_cursor_movement(index_tip)
-        result['cursor_pos'] = (cursor_x, cursor_y)
-        
-        # 2. Left click detection (index-thumb pinch)
-        result['left_click'] = self._recognize_left_click(index_tip, thumb_tip)
-        
-        # 3. Right click detection (middle-thumb pinch)
-        result['right_click'] = self._recognize_right_click(middle_tip, thumb_tip)
-        
-        # 4. Scroll detection (two-finger vertical movement)
-        result['scroll'] = self._recognize_scroll(index_tip, middle_tip, index_pip, middle_pip, wrist)
+        # Per-frame features shared by the gesture checks
+        left_distance = calculate_distance(index_tip, thumb_tip)
+        right_distance = calculate_distance(middle_tip, thumb_tip)
+        two_fingers = (is_finger_extended(index_tip, index_pip, wrist) and
+                       is_finger_extended(middle_tip, middle_pip, wrist))
+        midpoint_y = (index_tip.y + middle_tip.y) / 2
         
-        return result
+        return self._update(index_tip.x, index_tip.y, left_distance, right_distance,
+                            two_fingers, midpoint_y, timestamp)
     
-    def _recognize_cursor_movement(self, index_tip):
+    def recognize_batch(self, landmarks, stream_ids=None, timestamps=None, present=None):
         """
-        Recognize cursor movement from index finger position.
+        Recognize gestures for many frames at once.
+        
+        Per-frame features are computed with NumPy over the whole batch; the
+        stateful part (smoothing, state machine, scroll tracking) then runs row by
+        row in the same code as recognize(), so results are identical to
+        calling recognize() frame by frame in row order.
         
         Args:
-            index_tip: Index finger tip landmark
+            landmarks: (N, 21, 3) array of normalized landmarks. Without
+                present, rows containing NaN are frames without a hand.
+            stream_ids: Optional (N,) array of stream IDs. Each stream keeps
+                its own state; without IDs all rows continue this
+                recognizer's own state.
+            timestamps: Optional (N,) array of monotonic frame times in
+                seconds (default: row index / config.TARGET_FPS)
+            present: Optional (N,) bool array, True where the frame has a
+                hand. Datasets written by batch_process.py store absent
+                frames as all-zero rows, so pass their "present" array here.
         
         Returns:
-            Tuple of (screen_x, screen_y) in pixels
+            Dictionary of arrays:
+            {
+                'has_cursor': (N,) bool,
+                'cursor_pos': (N, 2) float64 screen pixels,
+                'left_click': (N,) bool,
+                'right_click': (N,) bool,
+                'scroll': (N,) float64, NaN where there is no scroll
+            }
         """
-        # Add to smoothing buffer
-        self.cursor_buffer.add(index_tip.x, index_tip.y)
-        
-        # Get smoothed position
-        smooth_x, smooth_y = self.cursor_buffer.get_average()
-        
-        if smooth_x is None or smooth_y is None:
-            return None, None
-        
-        # Convert to screen coordinates
-        screen_x, screen_y = normalize_to_screen(
-            smooth_x, smooth_y, 
-            self.frame_width, self.frame_height
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        num_frames = landmarks.shape[0]
+        if timestamps is None:
+            timestamps = np.arange(num_frames) / config.TARGET_FPS
+        
+        # Vectorized per-frame features, same arithmetic as recognize()
+        def coords(index):
+            return landmarks[:, index, 0], landmarks[:, index, 1]
+        
+        thumb_x, thumb_y = coords(config.THUMB_TIP)
+        index_x, index_y = coords(config.INDEX_TIP)
+        index_pip_x, index_pip_y = coords(config.INDEX_PIP)
+        middle_x, middle_y = coords(config.MIDDLE_TIP)
+        middle_pip_x, middle_pip_y = coords(config.MIDDLE_PIP)
+        wrist_x, wrist_y = coords(config.WRIST)
+        
+        def distance(x1, y1, x2, y2):
+            return np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        
+        left_distance = distance(index_x, index_y, thumb_x, thumb_y)
+        right_distance = distance(middle_x, middle_y, thumb_x, thumb_y)
+        two_fingers = (
+            (distance(index_x, index_y, wrist_x, wrist_y) >
+             distance(index_pip_x, index_pip_y, wrist_x, wrist_y)) &
+            (distance(middle_x, middle_y, wrist_x, wrist_y) >
+             distance(middle_pip_x, middle_pip_y, wrist_x, wrist_y))
         )
+        midpoint_y = (index_y + middle_y) / 2
+        if present is None:
+            has_hand = ~np.isnan(landmarks).any(axis=(1, 2))
+        else:
+            has_hand = np.asarray(present, dtype=bool)
+        
+        has_cursor = np.zeros(num_frames, dtype=bool)
+        cursor_pos = np.zeros((num_frames, 2), dtype=np.float64)
+        left_click = np.zeros(num_frames, dtype=bool)
+        right_click = np.zeros(num_frames, dtype=bool)
+        scroll = np.full(num_frames, np.nan, dtype=np.float64)
+        
+        if stream_ids is None:
+            stream_list = None
+        else:
+            stream_list = np.asarray(stream_ids).tolist()
+        
+        # Stateful pass, one row at a time
+        rows = zip(has_hand.tolist(), index_x.tolist(), index_y.tolist(),
+                   left_distance.tolist(), right_distance.tolist(),
+                   two_fingers.tolist(), midpoint_y.tolist(),
+                   np.asarray(timestamps, dtype=np.float64).tolist())
+        recognizer = self
+        for row, (hand, ix, iy, left, right, fingers, mid_y, timestamp) in enumerate(rows):
+            if stream_list is not None:
+                recognizer = self._stream(stream_list[row])
+            
+            if hand:
+                result = recognizer._update(ix, iy, left, right, fingers, mid_y, timestamp)
+            else:
+                result = recognizer.recognize(None, timestamp)
+            
+            if result.has_cursor:
+                has_cursor[row] = True
+                cursor_pos[row, 0] = result.cursor_x
+                cursor_pos[row, 1] = result.cursor_y
+            left_click[row] = result.left_click
+            right_click[row] = result.right_click
+            if result.scroll is not None:
+                scroll[row] = result.scroll
+        
+        return {
+            'has_cursor': has_cursor,
+            'cursor_pos': cursor_pos,
+            'left_click': left_click,
+            'right_click': right_click,
+            'scroll': scroll
+        }
+    
+    def _stream(self, stream_id):
+        """
+        Get the recognizer holding the state of one batch stream.
         
-        # Apply speed multiplier
-        screen_x = int(screen_x * config.CURSOR_SPEED_MULTIPLIER)
-        screen_y = int(screen_y * config.CURSOR_SPEED_MULTIPLIER)
+        Args:
+            stream_id: Stream identifier
         
-        return screen_x, screen_y
+        Returns:
+            GestureRecognizer for that stream, created on first use
+        """
+        recognizer = self.streams.get(stream_id)
+        if recognizer is None:
+            recognizer = GestureRecognizer(self.frame_width, self.frame_height,
+                                           screen_size=self.screen_size, verbose=False,
+                                           lut=self.lut)
+            self.streams[stream_id] = recognizer
+        return recognizer
     
-    def _recognize_left_click(self, index_tip, thumb_tip):
+    def _update(self, index_x, index_y, left_distance, right_distance,
+                two_fingers, midpoint_y, timestamp):
         """
-        Recognize left click gesture (index-thumb pinch).
+        Run all gesture checks for one frame from precomputed features.
         
         Args:
-            index_tip: Index finger tip landmark
-            thumb_tip: Thumb tip landmark
+            index_x: Normalized x of the index finger tip
+            index_y: Normalized y of the index finger tip
+            left_distance: Index-thumb tip distance
+            right_distance: Middle-thumb tip distance
+            two_fingers: True if index and middle fingers are both extended
+            midpoint_y: Normalized y midway between index and middle tips
+            timestamp: Monotonic time of the frame in seconds
         
         Returns:
-            True if left click should be triggered, False otherwise
-        """
-        # Calculate distance between index and thumb
-        distance = calculate_distance(index_tip, thumb_tip)
-        
-        # Check if pinching
-        if distance < config.PINCH_THRESHOLD:
-            # Check cooldown
-            if self.left_click_cooldown.can_trigger():
-                self.left_click_cooldown.trigger()
-                self.current_state = config.STATE_LEFT_CLICKING
-                return True
-        elif distance > config.PINCH_RELEASE_THRESHOLD:
-            # Released - reset state
-            if self.current_state == config.STATE_LEFT_CLICKING:
-                self.current_state = config.STATE_IDLE
-        
-        return False
+            The reused GestureResult
+        """
+        result = self.result
+        
+        # 1. Cursor movement (always based on index finger tip)
+        self._recognize_cursor_movement(index_x, index_y)
+        
+        # 2. Clicks and state changes, driven by the transition table
+        result.left_click = False
+        result.right_click = False
+        machine = self.state_machine
+        values = machine.values
+        values[FEATURE_HAND] = 1.0
+        values[FEATURE_LEFT_DISTANCE] = left_distance
+        values[FEATURE_RIGHT_DISTANCE] = right_distance
+        values[FEATURE_TWO_FINGERS] = two_fingers
+        scrolling = machine.update(timestamp, result) == config.STATE_SCROLLING
+        
+        # 3. Scroll amount while in the scrolling state
+        result.scroll = self._recognize_scroll(scrolling, midpoint_y)
+        result.scroll_active = scrolling
+        
+        return result
     
-    def _recognize_right_click(self, middle_tip, thumb_tip):
+    def _recognize_cursor_movement(self, index_x, index_y):
         """
-        Recognize right click gesture (middle-thumb pinch).
+        Recognize cursor movement from index finger position.
+        
+        Writes the screen position into the result object.
         
         Args:
-            middle_tip: Middle finger tip landmark
-            thumb_tip: Thumb tip landmark
+            index_x: Normalized x of the index finger tip
+            index_y: Normalized y of the index finger tip
+        """
+        # Add to smoothing buffer
+        self.cursor_buffer.add(index_x, index_y)
         
-        Returns:
-            True if right click should be triggered, False otherwise
-        """
-        # Calculate distance between middle and thumb
-        distance = calculate_distance(middle_tip, thumb_tip)
-        
-        # Check if pinching
-        if distance < config.PINCH_THRESHOLD:
-            # Check cooldown
-            if self.right_click_cooldown.can_trigger():
-                self.right_click_cooldown.trigger()
-                self.current_state = config.STATE_RIGHT_CLICKING
-                return True
-        elif distance > config.PINCH_RELEASE_THRESHOLD:
-            # Released - reset state
-            if self.current_state == config.STATE_RIGHT_CLICKING:
-                self.current_state = config.STATE_IDLE
-        
-        return False
+        # Convert smoothed position to screen coordinates
+        screen_x, screen_y = normalize_to_screen(
+            self.cursor_buffer.average_x, self.cursor_buffer.average_y,
+            self.frame_width, self.frame_height,
+            self.screen_size, self.lut
+        )
+        
+        # Apply speed multiplier
+        result = self.result
+        result.has_cursor = True
+        result.cursor_x = screen_x * config.CURSOR_SPEED_MULTIPLIER
+        result.cursor_y = screen_y * config.CURSOR_SPEED_MULTIPLIER
     
-    def _recognize_scroll(self, index_tip, middle_tip, index_pip, middle_pip, wrist):
+    def _recognize_scroll(self, scrolling, midpoint_y):
         """
         Recognize scroll gesture (two-finger vertical movement).
         
         Args:
-            index_tip: Index finger tip landmark
-            middle_tip: Middle finger tip landmark
-            index_pip: Index finger PIP joint landmark
-            middle_pip: Middle finger PIP joint landmark
-            wrist: Wrist landmark
+            scrolling: True if the state machine is in the scrolling state
+            midpoint_y: Normalized y midway between index and middle tips
         
         Returns:
             Scroll amount (positive = up, negative = down), or None
         """
-        # Check if both index and middle fingers are extended
-        index_extended = is_finger_extended(index_tip, index_pip, wrist)
-        middle_extended = is_finger_extended(middle_tip, middle_pip, wrist)
-        
-        if not (index_extended and middle_extended):
+        if not scrolling:
             self.previous_scroll_y = None
-            if self.current_state == config.STATE_SCROLLING:
-                self.current_state = config.STATE_IDLE
             return None
         
-        # Calculate midpoint between two fingers
-        midpoint_y = (index_tip.y + middle_tip.y) / 2
-        
         # Initialize previous position on first detection
         if self.previous_scroll_y is None:
             self.previous_scroll_y = midpoint_y
@@ -216,7 +330,6 @@ class GestureRecognizer:
         
         # Check if displacement exceeds threshold
         if abs(displacement) > config.SCROLL_THRESHOLD:
-            self.current_state = config.STATE_SCROLLING
             scroll_amount = displacement * config.SCROLL_MULTIPLIER
             self.previous_scroll_y = midpoint_y
             return scroll_amount
@@ -230,4 +343,4 @@ class GestureRecognizer:
         Returns:
             Current state string
         """
-        return self.current_state
+        return self.state_machine.state
@@ -0,0 +1,161 @@
+"""
+Table-driven gesture state machine.
+
+Transitions are declared in config.GESTURE_TRANSITIONS. Each one names the
+state it leaves and enters, a feature comparison that must hold (hysteresis
+comes from using different thresholds to enter and leave a state), how long
+it must hold (dwell), how often it may fire (cooldown) and the gesture it
+emits. The table is compiled per state, so each frame only evaluates the
+transitions leaving the current state, and all timing uses the one frame
+timestamp passed to update().
+"""
+import operator
+import config
+from utils import CooldownTimer
+
+# Per-frame features the recognizer provides, in GestureStateMachine.values
+FEATURES = ("hand", "left_distance", "right_distance", "two_fingers")
+FEATURE_HAND = 0
+FEATURE_LEFT_DISTANCE = 1
+FEATURE_RIGHT_DISTANCE = 2
+FEATURE_TWO_FINGERS = 3
+
+# GestureResult flags a transition may emit
+EMITS = ("left_click", "right_click")
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class Transition:
+    """One compiled row of the transition table, with its timing state."""
+    
+    __slots__ = ("source", "target", "feature", "compare", "threshold",
+                 "dwell", "cooldown_seconds", "cooldown", "emit", "since")
+    
+    def __init__(self, spec):
+        """
+        Compile a transition declaration.
+        
+        Args:
+            spec: Dictionary with "from", "to" and "when" (feature, operator,
+                threshold), and optional "dwell" (seconds the condition must
+                hold), "cooldown" (seconds between firings, shared by all
+                transitions emitting the same gesture) and "emit"
+                (GestureResult flag set when it fires)
+        """
+        feature, op, threshold = spec["when"]
+        if feature not in FEATURES:
+            raise ValueError(f"Unknown gesture feature: {feature}")
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown comparison operator: {op}")
+        emit = spec.get("emit")
+        if emit is not None and emit not in EMITS:
+            raise ValueError(f"Unknown gesture emit: {emit}")
+        
+        self.source = spec["from"]
+        self.target = spec["to"]
+        self.feature = FEATURES.index(feature)
+        self.compare = OPERATORS[op]
+        self.threshold = threshold
+        self.dwell = spec.get("dwell", 0.0)
+        self.cooldown_seconds = spec.get("cooldown", 0.0)
+        self.cooldown = None  # Shared CooldownTimer, set by GestureStateMachine
+        self.emit = emit
+        self.since = None
+
+
+class GestureStateMachine:
+    """Evaluates the transition table once per frame."""
+    
+    __slots__ = ("initial", "state", "values", "table", "_current")
+    
+    def __init__(self, transitions=config.GESTURE_TRANSITIONS, initial=config.STATE_IDLE):
+        """
+        Initialize state machine.
+        
+        Args:
+            transitions: Transition declarations (see Transition), evaluated
+                in order, so earlier rows win when several could fire
+            initial: State entered on reset (no hand in view)
+        """
+        self.initial = initial
+        self.values = [0.0] * len(FEATURES)
+        
+        # Transitions grouped by the state they leave; transitions emitting
+        # the same gesture share one cooldown timer
+        table = {}
+        cooldowns = {}
+        for spec in transitions:
+            transition = Transition(spec)
+            if transition.cooldown_seconds > 0:
+                key = transition.emit or transition.target
+                if key not in cooldowns:
+                    cooldowns[key] = CooldownTimer(transition.cooldown_seconds)
+                transition.cooldown = cooldowns[key]
+            table.setdefault(transition.source, []).append(transition)
+        self.table = {state: tuple(rows) for state, rows in table.items()}
+        
+        self.reset()
+    
+    def reset(self):
+        """Return to the initial state. Cooldowns keep running."""
+        self._enter(self.initial)
+    
+    def _enter(self, state):
+        """Switch state and restart dwell timing of its transitions."""
+        self.state = state
+        current = self._current = self.table.get(state, ())
+        
+        # Index loops: a for loop would allocate an iterator every frame
+        i = 0
+        while i < len(current):
+            current[i].since = None
+            i += 1
+    
+    def update(self, timestamp, result):
+        """
+        Evaluate the transitions leaving the current state.
+        
+        At most one transition fires per frame. Feature values must be
+        written to self.values before calling.
+        
+        Args:
+            timestamp: Monotonic time of the frame in seconds
+            result: GestureResult that emitted gestures are set on
+        
+        Returns:
+            The current state after this frame
+        """
+        values = self.values
+        current = self._current
+        i = 0
+        while i < len(current):
+            transition = current[i]
+            i += 1
+            if not transition.compare(values[transition.feature], transition.threshold):
+                transition.since = None
+                continue
+            
+            if transition.dwell > 0:
+                if transition.since is None:
+                    transition.since = timestamp
+                if timestamp - transition.since < transition.dwell:
+                    continue
+            
+            cooldown = transition.cooldown
+            if cooldown is not None:
+                if not cooldown.can_trigger(timestamp):
+                    continue
+                cooldown.trigger(timestamp)
+            
+            if transition.emit is not None:
+                setattr(result, transition.emit, True)
+            self._enter(transition.target)
+            break
+        
+        return self.state
@@ -1,9 +1,32 @@
 """
-Hand tracking wrapper using MediaPipe Hands.
+Hand tracking wrappers using MediaPipe.
+
+Two interchangeable backends share the process_frame / get_landmarks /
+draw_landmarks contract:
+    solutions - legacy mp.solutions.hands, blocks for the whole inference
+    tasks     - Tasks HandLandmarker in LIVE_STREAM mode, inference runs
+                asynchronously while the next frame is captured
 """
+import os
+import time
 import cv2
 import mediapipe as mp
+import numpy as np
 import config
+from overlay import OverlayRenderer, NUM_LANDMARKS
+from utils import landmarks_to_array
+
+BACKEND_SOLUTIONS = "solutions"
+BACKEND_TASKS = "tasks"
+BACKENDS = (BACKEND_SOLUTIONS, BACKEND_TASKS)
+
+HAND_LANDMARKER_MODEL_URL = ("https://storage.googleapis.com/mediapipe-models/"
+                             "hand_landmarker/hand_landmarker/float16/latest/"
+                             "hand_landmarker.task")
+
+# Returned by TasksHandTracker.process_frame when no detection has finished
+# since the previous call, so callers can skip work on an old result
+NO_NEW_RESULT = object()
 
 
 class HandTracker:
@@ -12,13 +35,16 @@ class HandTracker:
     def __init__(self):
         """Initialize MediaPipe Hands."""
         self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        
+        # Drawing styles are computed once, not per frame
+        self.overlay = OverlayRenderer()
+        self._draw_landmarks = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
         
         # Initialize hands detector
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,  # Video mode for better performance
             max_num_hands=config.MAX_NUM_HANDS,
+            model_complexity=config.MODEL_COMPLEXITY,
             min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
             min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
         )
@@ -76,18 +102,180 @@ class HandTracker:
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
                 # Draw landmarks and connections
-                self.mp_drawing.draw_landmarks(
-                    frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
+                landmarks_to_array(hand_landmarks.landmark, out=self._draw_landmarks)
+                self.overlay.draw_hand(frame, self._draw_landmarks)
         
         return frame
     
+    def reset(self):
+        """Forget tracking state, e.g. before processing an unrelated recording."""
+        self.hands.reset()
+    
     def release(self):
         """Release MediaPipe resources."""
         if self.hands:
             self.hands.close()
             print("Hand tracker released")
+
+
+class TasksHandTracker:
+    """
+    Wrapper for the MediaPipe Tasks HandLandmarker in LIVE_STREAM mode.
+    
+    process_frame() submits the frame with detect_async() and returns
+    immediately with the newest result the callback has delivered, which is
+    usually the previous frame's, or NO_NEW_RESULT if nothing arrived since
+    the last call. Frames submitted while the landmarker is still busy are
+    dropped by MediaPipe, so latency never builds up.
+    """
+    
+    def __init__(self, model_path=config.HAND_LANDMARKER_MODEL_PATH,
+                 delegate=config.HAND_LANDMARKER_DELEGATE):
+        """
+        Initialize the HandLandmarker.
+        
+        Args:
+            model_path: Path of the hand_landmarker.task model bundle
+            delegate: Inference delegate, "cpu" or "gpu"
+        """
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError(
+                f"Hand landmarker model not found: {model_path}\n"
+                f"Download it from {HAND_LANDMARKER_MODEL_URL}")
+        
+        vision = mp.tasks.vision
+        delegates = {"cpu": mp.tasks.BaseOptions.Delegate.CPU,
+                     "gpu": mp.tasks.BaseOptions.Delegate.GPU}
+        if delegate not in delegates:
+            raise ValueError(f"Unknown delegate: {delegate}")
+        self.delegate = delegate
+        
+        self.overlay = OverlayRenderer()
+        self._draw_landmarks = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        
+        # (timestamp_ms, result) written by the MediaPipe callback thread,
+        # read by the main loop
+        self.latest = None
+        self._last_returned = None
+        self._last_submitted_ms = -1
+        
+        options = vision.HandLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path,
+                                              delegate=delegates[delegate]),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=config.MAX_NUM_HANDS,
+            min_hand_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+            min_hand_presence_confidence=config.MIN_TRACKING_CONFIDENCE,
+            min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE,
+            result_callback=self._on_result
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+        
+        print(f"Hand tracker initialized (tasks, {delegate} delegate)")
+    
+    def _on_result(self, result, output_image, timestamp_ms):
+        """Receive a finished detection from MediaPipe (callback thread)."""
+        # One attribute assignment, so the main loop never pairs a result
+        # with another result's timestamp
+        self.latest = (timestamp_ms, result)
+    
+    def process_frame(self, frame):
+        """
+        Submit frame for asynchronous hand detection.
+        
+        Args:
+            frame: BGR frame from camera
+        
+        Returns:
+            HandLandmarkerResult delivered since the previous call,
+            NO_NEW_RESULT if none was, or None before the first result
+        """
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        
+        # LIVE_STREAM requires strictly increasing timestamps
+        timestamp_ms = int(time.monotonic() * 1000)
+        if timestamp_ms <= self._last_submitted_ms:
+            timestamp_ms = self._last_submitted_ms + 1
+        self._last_submitted_ms = timestamp_ms
+        
+        self.landmarker.detect_async(image, timestamp_ms)
+        
+        # Each result is returned once, so it is recognized only once. The
+        # callback may run at any time, so the attribute is read once.
+        latest = self.latest
+        if latest is None:
+            return None
+        if latest is self._last_returned:
+            return NO_NEW_RESULT
+        self._last_returned = latest
+        return latest[1]
+    
+    def get_landmarks(self, results):
+        """
+        Extract hand landmarks from results.
+        
+        Args:
+            results: Value returned by process_frame (NO_NEW_RESULT reads
+                the result returned last)
+        
+        Returns:
+            List of normalized landmarks (0-1 range), or None if no hands detected
+        """
+        if results is NO_NEW_RESULT:
+            results = self._last_returned[1]
+        if results is not None and results.hand_landmarks:
+            # Return first hand's landmarks
+            return results.hand_landmarks[0]
+        
+        return None
+    
+    def draw_landmarks(self, frame, results):
+        """
+        Draw hand landmarks on frame for visual feedback.
+        
+        Args:
+            frame: Frame to draw on
+            results: Value returned by process_frame
+        
+        Returns:
+            Frame with landmarks drawn
+        """
+        if results is NO_NEW_RESULT:
+            results = self._last_returned[1]
+        if not config.SHOW_LANDMARKS or results is None:
+            return frame
+        
+        for hand_landmarks in results.hand_landmarks:
+            landmarks_to_array(hand_landmarks, out=self._draw_landmarks)
+            self.overlay.draw_hand(frame, self._draw_landmarks)
+        
+        return frame
+    
+    def release(self):
+        """Release MediaPipe resources."""
+        if self.landmarker:
+            self.landmarker.close()
+            self.landmarker = None
+            print("Hand tracker released")
+
+
+def create_hand_tracker(backend=None):
+    """
+    Create a hand tracker for the given backend.
+    
+    Args:
+        backend: BACKEND_SOLUTIONS or BACKEND_TASKS
+            (default: config.HAND_TRACKER_BACKEND)
+    
+    Returns:
+        HandTracker or TasksHandTracker instance
+    """
+    if backend is None:
+        backend = config.HAND_TRACKER_BACKEND
+    
+    if backend == BACKEND_SOLUTIONS:
+        return HandTracker()
+    if backend == BACKEND_TASKS:
+        return TasksHandTracker()
+    raise ValueError(f"Unknown hand tracker backend: {backend}")
@@ -2,18 +2,74 @@
 Gesture-Controlled Windows Software
 Main application entry point.
 """
+import argparse
 import cv2
 import sys
+import time
 from camera_handler import CameraHandler
-from hand_tracker import HandTracker
-from gesture_recognizer import GestureRecognizer
-from system_controller import SystemController
+from frame_sources import PACING_MODES, PACING_UNTHROTTLED
+from hand_tracker import BACKENDS, NO_NEW_RESULT, create_hand_tracker
+from flow_tracker import FlowTracker, TRACKING_FLOW, TRACKING_MODES
+from gesture_recognizer import GestureRecognizer, GestureResult
+from flight_recorder import FlightRecorder
+from calibration import Calibration
+from overlay import HudLayer
+from scroll_engine import ScrollEngine
+from profiler import (FrameProfiler, StageTimer, STAGE_CAMERA, STAGE_TRACKER,
+                      STAGE_RECOGNIZER, STAGE_CONTROLLER, STAGE_RENDER)
 from utils import FPSCounter
 import config
 
 
-def main():
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    
+    Returns:
+        argparse.Namespace with the parsed options
+    """
+    parser = argparse.ArgumentParser(description="Control the mouse with hand gestures.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the preview window")
+    parser.add_argument("--source", default=None,
+                        help="Frame source: camera index, video file, image "
+                             "directory or 'synthetic' (default: camera)")
+    parser.add_argument("--pacing", choices=PACING_MODES, default=None,
+                        help="Deliver frames at the source FPS or as fast as possible")
+    parser.add_argument("--replay", metavar="VIDEO",
+                        help="Replay a recording as fast as possible "
+                             "(same as --source VIDEO --pacing unthrottled)")
+    parser.add_argument("--tracker", choices=BACKENDS, default=None,
+                        help="Hand tracker backend "
+                             f"(default: {config.HAND_TRACKER_BACKEND})")
+    parser.add_argument("--tracking", choices=TRACKING_MODES, default=config.TRACKING_MODE,
+                        help="Run MediaPipe on every frame, or track key landmarks "
+                             "with optical flow between inferences")
+    parser.add_argument("--no-calibration", action="store_true",
+                        help="Ignore the lens and screen calibration file")
+    parser.add_argument("--no-control", action="store_true",
+                        help="Recognize gestures without moving the mouse")
+    parser.add_argument("--profile", nargs="?", const="cprofile",
+                        choices=("cprofile", "sample"),
+                        help="Profile the main loop and write a report")
+    parser.add_argument("--profile-frames", type=int, default=None,
+                        help=f"Frames to profile (default: {config.PROFILE_FRAMES})")
+    parser.add_argument("--profile-seconds", type=float, default=None,
+                        help="Seconds to profile instead of a frame count")
+    parser.add_argument("--profile-output", default=config.PROFILE_REPORT_PATH,
+                        help="Path of the profile report")
+    parser.add_argument("--no-flight-recorder", action="store_true",
+                        help="Do not keep recent frames in memory for dumps")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main application loop."""
+    args = parse_args(argv)
+    
     print("=" * 50)
     print("GESTURE CONTROL - Starting Application")
     print("=" * 50)
@@ -28,48 +84,125 @@ def main():
     print()
     
     # Initialize components
-    camera = CameraHandler()
+    if args.replay:
+        camera = CameraHandler(args.replay, pacing=args.pacing or PACING_UNTHROTTLED)
+    elif args.source is not None:
+        camera = CameraHandler(args.source, pacing=args.pacing)
+    else:
+        camera = CameraHandler(pacing=args.pacing)
     if not camera.start():
         print("Failed to start camera. Exiting.")
         return
     
-    hand_tracker = HandTracker()
+    hand_tracker = create_hand_tracker(args.tracker)
+    if args.tracking == TRACKING_FLOW:
+        hand_tracker = FlowTracker(hand_tracker)
     frame_width, frame_height = camera.get_dimensions()
-    gesture_recognizer = GestureRecognizer(frame_width, frame_height)
-    system_controller = SystemController()
+    calibration = None if args.no_calibration else Calibration.load()
+    if calibration is not None:
+        calibration.prepare(frame_width, frame_height)
+    
+    # PyAutoGUI needs a display, so it is only imported when controlling the mouse
+    if args.no_control:
+        system_controller = None
+        screen_size = config.NO_CONTROL_SCREEN_SIZE
+        failsafe_errors = ()  # Catches nothing
+    else:
+        from system_controller import SystemController, FailSafeException
+        system_controller = SystemController()
+        screen_size = system_controller.get_screen_size()
+        failsafe_errors = FailSafeException
+    gesture_recognizer = GestureRecognizer(
+        frame_width, frame_height, screen_size=screen_size,
+        lut=calibration.lut if calibration else None)
+    scroll_engine = ScrollEngine(
+        resolution=system_controller.scroll_resolution if system_controller else 1)
     fps_counter = FPSCounter()
+    hud = HudLayer()
+    no_gestures = GestureResult()  # Emitted on frames without a new tracker result
+    
+    flight_recorder = None
+    if config.FLIGHT_RECORDER_ENABLED and not args.no_flight_recorder:
+        flight_recorder = FlightRecorder()
+        signal_name = flight_recorder.install_signal_handler()
+        if signal_name:
+            print(f"Send {signal_name} to dump the flight recorder")
+    
+    profiler = None
+    if args.profile:
+        max_frames = args.profile_frames
+        if max_frames is None and args.profile_seconds is None:
+            max_frames = config.PROFILE_FRAMES
+        profiler = FrameProfiler(args.profile, max_frames=max_frames,
+                                 max_seconds=args.profile_seconds,
+                                 output_path=args.profile_output,
+                                 sample_interval=config.PROFILE_SAMPLE_INTERVAL)
+        stage_timer = profiler.stage_timer
+    else:
+        stage_timer = StageTimer()
     
     print("All components initialized. Starting main loop...")
     print("Press ESC to exit.\n")
     
+    if profiler is not None:
+        profiler.start()
+    
     try:
         while True:
+            if profiler is not None:
+                profiler.begin_frame()
+            else:
+                stage_timer.start()
+            
             # Capture frame
             frame = camera.read_frame()
             if frame is None:
                 print("Failed to read frame")
                 break
+            stage_timer.lap(STAGE_CAMERA)
             
-            # Process frame for hand detection
+            # Process frame for hand detection. The async tracker may have
+            # nothing new this frame; recognizing its old result again would
+            # repeat clicks and scroll
             results = hand_tracker.process_frame(frame)
-            landmarks = hand_tracker.get_landmarks(results)
+            new_result = results is not NO_NEW_RESULT
+            if new_result:
+                landmarks = hand_tracker.get_landmarks(results)
+            stage_timer.lap(STAGE_TRACKER)
             
-            # Recognize gestures
-            gestures = gesture_recognizer.recognize(landmarks)
+            # Recognize gestures on lens-corrected landmarks
+            # (one timestamp for all timing in this frame)
+            now = time.monotonic()
+            if new_result:
+                if calibration is not None and landmarks is not None:
+                    landmarks = calibration.undistort(landmarks)
+                gestures = gesture_recognizer.recognize(landmarks, now)
+            else:
+                gestures = no_gestures
+            stage_timer.lap(STAGE_RECOGNIZER)
             
             # Execute actions based on gestures
-            if gestures['cursor_pos'] is not None:
-                x, y = gestures['cursor_pos']
-                system_controller.move_cursor(x, y)
-            
-            if gestures['left_click']:
-                system_controller.left_click()
-            
-            if gestures['right_click']:
-                system_controller.right_click()
-            
-            if gestures['scroll'] is not None:
-                system_controller.scroll(gestures['scroll'])
+            if system_controller is not None:
+                if new_result:
+                    if gestures.has_cursor:
+                        system_controller.move_cursor(gestures.cursor_x, gestures.cursor_y)
+                    
+                    if gestures.left_click:
+                        system_controller.left_click()
+                    
+                    if gestures.right_click:
+                        system_controller.right_click()
+                    
+                    if gestures.scroll is not None:
+                        scroll_engine.add(gestures.scroll, now)
+                    if not gestures.scroll_active:
+                        scroll_engine.release(now)
+                
+                # Scroll momentum keeps running between tracker results
+                scroll_amount = scroll_engine.update(now)
+                if scroll_amount:
+                    system_controller.scroll(scroll_amount)
+            stage_timer.lap(STAGE_CONTROLLER)
             
             # Draw visual feedback
             frame = hand_tracker.draw_landmarks(frame, results)
@@ -78,26 +211,32 @@ def main():
             if config.SHOW_FPS:
                 fps = fps_counter.update()
                 state = gesture_recognizer.get_state()
-                cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30),
-                           cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                cv2.putText(frame, f"State: {state}", (10, 70),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                
-                # Show hand detection status
-                hand_status = "Hand Detected" if landmarks else "No Hand"
-                color = (0, 255, 0) if landmarks else (0, 0, 255)
-                cv2.putText(frame, hand_status, (10, 110),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+                hud.draw(frame, fps, state, landmarks is not None)
             
             # Display frame
-            cv2.imshow('Gesture Control', frame)
+            if not args.headless:
+                cv2.imshow('Gesture Control', frame)
+                
+                # Check for exit key (ESC)
+                key = cv2.waitKey(1) & 0xFF
+                if key == 27:  # ESC key
+                    print("\nESC pressed. Exiting...")
+                    break
+            stage_timer.lap(STAGE_RENDER)
             
-            # Check for exit key (ESC)
-            key = cv2.waitKey(1) & 0xFF
-            if key == 27:  # ESC key
-                print("\nESC pressed. Exiting...")
+            if flight_recorder is not None:
+                flight_recorder.record(frame, landmarks, gesture_recognizer.get_state(),
+                                       gestures, stage_timer.durations, now)
+            
+            if profiler is not None and profiler.end_frame():
+                print("\nProfiling complete. Exiting...")
                 break
     
+    except failsafe_errors:
+        print("\nFailsafe triggered. Exiting...")
+        if flight_recorder is not None:
+            flight_recorder.dump("failsafe")
+    
     except KeyboardInterrupt:
         print("\n\nKeyboard interrupt detected. Exiting...")
     
@@ -105,13 +244,21 @@ def main():
         print(f"\nError occurred: {e}")
         import traceback
         traceback.print_exc()
+        if flight_recorder is not None:
+            flight_recorder.dump("error")
     
     finally:
         # Cleanup
         print("\nCleaning up resources...")
+        if profiler is not None:
+            profiler.stop()
+        if flight_recorder is not None:
+            flight_recorder.wait()
         camera.release()
         hand_tracker.release()
-        cv2.destroyAllWindows()
+        if not args.headless:
+            # Not implemented in opencv-python-headless
+            cv2.destroyAllWindows()
         print("Cleanup complete. Goodbye!")
 
 
@@ -0,0 +1,136 @@
+"""
+Fast visual feedback overlays for the preview window.
+
+OverlayRenderer draws the hand skeleton from a landmark array with two OpenCV
+calls (one for all connections, one for all joints) using styles computed
+once. HudLayer keeps the text HUD in a cached image that is only re-rendered
+when the displayed values change.
+"""
+import cv2
+import numpy as np
+import config
+
+# MediaPipe hand topology (same pairs as mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+NUM_LANDMARKS = 21
+
+
+class OverlayRenderer:
+    """Draws hand landmarks and connections in batched OpenCV calls."""
+    
+    def __init__(self, landmark_color=config.LANDMARK_DRAW_COLOR,
+                 connection_color=config.CONNECTION_DRAW_COLOR,
+                 landmark_radius=config.LANDMARK_DRAW_RADIUS,
+                 connection_thickness=config.CONNECTION_DRAW_THICKNESS):
+        """
+        Initialize overlay renderer.
+        
+        Args:
+            landmark_color: BGR color of the joints
+            connection_color: BGR color of the connections
+            landmark_radius: Joint radius in pixels
+            connection_thickness: Connection line thickness in pixels
+        """
+        self.landmark_color = tuple(int(c) for c in landmark_color)
+        self.connection_color = tuple(int(c) for c in connection_color)
+        self.landmark_radius = landmark_radius
+        self.connection_thickness = connection_thickness
+        
+        # Preallocated buffers reused for every frame
+        self._connection_index = np.array(HAND_CONNECTIONS, dtype=np.intp)
+        self._scale = np.zeros(2, dtype=np.float32)
+        self._scaled = np.zeros((NUM_LANDMARKS, 2), dtype=np.float32)
+        self._points = np.zeros((NUM_LANDMARKS, 2), dtype=np.int32)
+        self._segments = np.zeros((len(HAND_CONNECTIONS), 2, 2), dtype=np.int32)
+        self._joints = np.zeros((NUM_LANDMARKS, 2, 2), dtype=np.int32)
+    
+    def draw_hand(self, frame, landmarks):
+        """
+        Draw one hand onto the frame.
+        
+        Args:
+            frame: BGR frame to draw on (modified in place)
+            landmarks: (21, 3) array of normalized landmark coordinates
+        """
+        height, width = frame.shape[:2]
+        self._scale[0] = width
+        self._scale[1] = height
+        
+        # Normalized coordinates to pixels
+        np.multiply(landmarks[:, :2], self._scale, out=self._scaled)
+        self._points[:] = self._scaled
+        
+        # All connections as one set of two-point polylines
+        np.take(self._points, self._connection_index, axis=0, out=self._segments)
+        cv2.polylines(frame, self._segments, False, self.connection_color,
+                      self.connection_thickness)
+        
+        # Joints as zero-length segments: a thick line with round caps is a
+        # filled circle, so all 21 joints are drawn in a single call
+        self._joints[:, 0] = self._points
+        self._joints[:, 1] = self._points
+        cv2.polylines(frame, self._joints, False, self.landmark_color,
+                      self.landmark_radius * 2)
+
+
+class HudLayer:
+    """Text HUD rendered into a cached layer and composited onto each frame."""
+    
+    def __init__(self, width=config.HUD_WIDTH, height=config.HUD_HEIGHT):
+        """
+        Initialize HUD layer.
+        
+        Args:
+            width: Width of the HUD area in pixels (top-left corner of frame)
+            height: Height of the HUD area in pixels
+        """
+        self.width = width
+        self.height = height
+        self._layer = np.zeros((height, width, 3), dtype=np.uint8)
+        self._mask = np.zeros((height, width), dtype=np.uint8)
+        self._values = None
+    
+    def _render(self, fps, state, hand_detected):
+        """Re-render the HUD text into the cached layer."""
+        layer = self._layer
+        layer[:] = 0
+        
+        cv2.putText(layer, f"FPS: {fps:.1f}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        cv2.putText(layer, f"State: {state}", (10, 70),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        
+        # Show hand detection status
+        hand_status = "Hand Detected" if hand_detected else "No Hand"
+        color = (0, 255, 0) if hand_detected else (0, 0, 255)
+        cv2.putText(layer, hand_status, (10, 110),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        
+        self._mask[:] = np.any(layer, axis=2)
+    
+    def draw(self, frame, fps, state, hand_detected):
+        """
+        Composite the HUD onto the frame, re-rendering only on change.
+        
+        Args:
+            frame: BGR frame to draw on (modified in place)
+            fps: Current frames per second
+            state: Current gesture state string
+            hand_detected: True if a hand is visible
+        """
+        values = (round(fps, 1), state, hand_detected)
+        if values != self._values:
+            self._render(fps, state, hand_detected)
+            self._values = values
+        
+        height = min(self.height, frame.shape[0])
+        width = min(self.width, frame.shape[1])
+        cv2.copyTo(self._layer[:height, :width], self._mask[:height, :width],
+                   frame[:height, :width])
@@ -0,0 +1,253 @@
+"""
+Profiling support for the main loop.
+
+StageTimer splits each frame into the pipeline stages (camera, hand tracking,
+gesture recognition, system control and rendering). FrameProfiler combines
+those per-stage timings with cProfile or a sampling profiler and tracemalloc,
+and writes a plain-text report.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Pipeline stages, in the order they run within a frame
+STAGE_CAMERA = 0
+STAGE_TRACKER = 1
+STAGE_RECOGNIZER = 2
+STAGE_CONTROLLER = 3
+STAGE_RENDER = 4
+STAGE_NAMES = ("CameraHandler", "HandTracker", "GestureRecognizer",
+               "SystemController", "Rendering")
+
+
+class StageTimer:
+    """Lap timer recording how long each pipeline stage took in a frame."""
+    
+    __slots__ = ("durations", "current_stage", "_last")
+    
+    def __init__(self):
+        self.durations = [0.0] * len(STAGE_NAMES)
+        self.current_stage = STAGE_CAMERA
+        self._last = 0.0
+    
+    def start(self):
+        """Start timing a new frame."""
+        self._last = time.perf_counter()
+        self.current_stage = STAGE_CAMERA
+    
+    def lap(self, stage):
+        """
+        Record the end of a stage.
+        
+        Args:
+            stage: Index of the stage that just finished (STAGE_* constant)
+        """
+        now = time.perf_counter()
+        self.durations[stage] = now - self._last
+        self._last = now
+        self.current_stage = stage + 1
+
+
+class _StackSampler(threading.Thread):
+    """Background thread that periodically samples the main thread's stack."""
+    
+    def __init__(self, stage_timer, interval):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.stage_timer = stage_timer
+        self.interval = interval
+        self.target_ident = threading.main_thread().ident
+        self.stage_samples = Counter()
+        self.function_samples = Counter()
+        self.total_samples = 0
+        self._stop_event = threading.Event()
+    
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None:
+                continue
+            
+            code = frame.f_code
+            location = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            stage = min(self.stage_timer.current_stage, len(STAGE_NAMES) - 1)
+            
+            self.stage_samples[STAGE_NAMES[stage]] += 1
+            self.function_samples[location] += 1
+            self.total_samples += 1
+    
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class FrameProfiler:
+    """Profiles a fixed number of frames or seconds of the main loop."""
+    
+    def __init__(self, mode="cprofile", max_frames=None, max_seconds=None,
+                 output_path="profile_report.txt", sample_interval=0.001):
+        """
+        Initialize frame profiler.
+        
+        Args:
+            mode: "cprofile" for deterministic profiling, "sample" for sampling
+            max_frames: Stop after this many frames (None = no frame limit)
+            max_seconds: Stop after this many seconds (None = no time limit)
+            output_path: Path of the text report (cProfile also writes .prof)
+            sample_interval: Seconds between stack samples in sample mode
+        """
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        
+        self.mode = mode
+        self.max_frames = max_frames
+        self.max_seconds = max_seconds
+        self.output_path = output_path
+        self.sample_interval = sample_interval
+        
+        self.stage_timer = StageTimer()
+        self.stage_totals = [0.0] * len(STAGE_NAMES)
+        self.stage_max = [0.0] * len(STAGE_NAMES)
+        self.frame_times = []
+        self.frame_blocks = []
+        self.frame_peaks = []
+        
+        self._profile = None
+        self._sampler = None
+        self._start_snapshot = None
+        self._start_time = 0.0
+        self._frame_start = 0.0
+        self._blocks_before = 0
+        self.finished = False
+    
+    def start(self):
+        """Start profiling."""
+        tracemalloc.start()
+        self._start_snapshot = tracemalloc.take_snapshot()
+        
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _StackSampler(self.stage_timer, self.sample_interval)
+            self._sampler.start()
+        
+        self._start_time = time.perf_counter()
+        print(f"Profiling started ({self.mode})")
+    
+    def begin_frame(self):
+        """Mark the start of a frame."""
+        tracemalloc.reset_peak()
+        self._blocks_before = sys.getallocatedblocks()
+        self._frame_start = time.perf_counter()
+        self.stage_timer.start()
+    
+    def end_frame(self):
+        """
+        Mark the end of a frame and record its statistics.
+        
+        Returns:
+            True once the frame or time limit has been reached
+        """
+        now = time.perf_counter()
+        self.frame_times.append(now - self._frame_start)
+        self.frame_blocks.append(sys.getallocatedblocks() - self._blocks_before)
+        self.frame_peaks.append(tracemalloc.get_traced_memory()[1])
+        
+        for stage, duration in enumerate(self.stage_timer.durations):
+            self.stage_totals[stage] += duration
+            if duration > self.stage_max[stage]:
+                self.stage_max[stage] = duration
+        
+        if self.max_frames is not None and len(self.frame_times) >= self.max_frames:
+            self.finished = True
+        if self.max_seconds is not None and now - self._start_time >= self.max_seconds:
+            self.finished = True
+        
+        return self.finished
+    
+    def stop(self):
+        """Stop profiling and write the report."""
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        
+        end_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        
+        report = self._build_report(end_snapshot)
+        with open(self.output_path, "w") as f:
+            f.write(report)
+        
+        if self._profile is not None:
+            prof_path = os.path.splitext(self.output_path)[0] + ".prof"
+            self._profile.dump_stats(prof_path)
+            print(f"cProfile data written to {prof_path}")
+        
+        print(f"Profile report written to {self.output_path}")
+    
+    def _build_report(self, end_snapshot):
+        """Format the collected statistics as text."""
+        frames = len(self.frame_times)
+        lines = ["GESTURE CONTROL - Profile Report", "=" * 60]
+        if frames == 0:
+            lines.append("No frames recorded.")
+            return "\n".join(lines) + "\n"
+        
+        total_time = sum(self.frame_times)
+        lines.append(f"Mode: {self.mode}")
+        lines.append(f"Frames: {frames}")
+        lines.append(f"Average frame time: {total_time / frames * 1000:.2f} ms "
+                     f"({frames / total_time:.1f} FPS)")
+        lines.append(f"Slowest frame: {max(self.frame_times) * 1000:.2f} ms")
+        lines.append("(timings include tracemalloc and profiler overhead)")
+        
+        lines.append("")
+        lines.append("Time per stage")
+        lines.append("-" * 60)
+        lines.append(f"{'Stage':<20}{'avg ms':>10}{'max ms':>10}{'share':>10}")
+        for stage, name in enumerate(STAGE_NAMES):
+            stage_total = self.stage_totals[stage]
+            lines.append(f"{name:<20}{stage_total / frames * 1000:>10.3f}"
+                         f"{self.stage_max[stage] * 1000:>10.3f}"
+                         f"{stage_total / total_time * 100:>9.1f}%")
+        
+        lines.append("")
+        lines.append("Memory (tracemalloc)")
+        lines.append("-" * 60)
+        sorted_blocks = sorted(self.frame_blocks)
+        lines.append(f"Net allocated blocks per frame: "
+                     f"avg {sum(self.frame_blocks) / frames:.1f}, "
+                     f"median {sorted_blocks[frames // 2]}, max {sorted_blocks[-1]}")
+        lines.append(f"Peak traced memory in a frame: {max(self.frame_peaks) / 1024:.1f} KiB")
+        lines.append("Top allocation growth by line:")
+        for stat in end_snapshot.compare_to(self._start_snapshot, "lineno")[:10]:
+            lines.append(f"  {stat}")
+        
+        lines.append("")
+        if self._sampler is not None:
+            total_samples = max(self._sampler.total_samples, 1)
+            lines.append(f"Samples per stage ({self._sampler.total_samples} samples)")
+            lines.append("-" * 60)
+            for name, count in self._sampler.stage_samples.most_common():
+                lines.append(f"{name:<20}{count:>10}{count / total_samples * 100:>9.1f}%")
+            lines.append("")
+            lines.append("Top sampled functions")
+            lines.append("-" * 60)
+            for location, count in self._sampler.function_samples.most_common(25):
+                lines.append(f"{location:<50}{count / total_samples * 100:>9.1f}%")
+        else:
+            lines.append("Top functions by cumulative time (cProfile)")
+            lines.append("-" * 60)
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(25)
+            lines.append(stream.getvalue())
+        
+        return "\n".join(lines) + "\n"
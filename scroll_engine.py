@@ -0,0 +1,135 @@
+"""
+Scroll engine turning fractional per-frame scroll gestures into OS scroll events.
+
+Fractional deltas are accumulated instead of truncated, events are coalesced
+to a capped rate, and optional momentum keeps scrolling after the fingers
+lift, decaying smoothly to a stop.
+"""
+import math
+import config
+
+
+class ScrollEngine:
+    """Accumulates, coalesces and extrapolates scroll input."""
+    
+    __slots__ = ("min_interval", "resolution", "momentum", "decay", "min_velocity",
+                 "window", "pending", "velocity", "active", "coasting",
+                 "last_add_time", "last_update_time", "last_emit_time")
+    
+    def __init__(self, max_rate=config.SCROLL_MAX_EVENTS_PER_SECOND, resolution=1,
+                 momentum=config.SCROLL_MOMENTUM, decay=config.SCROLL_MOMENTUM_DECAY,
+                 min_velocity=config.SCROLL_MOMENTUM_MIN_VELOCITY,
+                 window=config.SCROLL_MOMENTUM_WINDOW):
+        """
+        Initialize scroll engine.
+        
+        Args:
+            max_rate: Maximum scroll events sent per second
+            resolution: Steps per wheel click the backend accepts (1 = whole
+                clicks only, 120 = Windows high-resolution wheel deltas)
+            momentum: Keep scrolling after the fingers lift
+            decay: Momentum decay rate per second (higher stops sooner)
+            min_velocity: Momentum stops below this speed (clicks per second)
+            window: Seconds without movement after which the hand counts as
+                held still, so lifting the fingers does not fling
+        """
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.resolution = resolution
+        self.momentum = momentum
+        self.decay = decay
+        self.min_velocity = min_velocity
+        self.window = window
+        self.reset()
+    
+    def reset(self):
+        """Drop any pending scroll and stop momentum."""
+        self.pending = 0.0
+        self.velocity = 0.0
+        self.active = False
+        self.coasting = False
+        self.last_add_time = None
+        self.last_update_time = None
+        self.last_emit_time = -math.inf
+    
+    def add(self, amount, now):
+        """
+        Add a scroll delta from the recognizer.
+        
+        Args:
+            amount: Scroll amount in wheel clicks (positive = up), may be fractional
+            now: Monotonic timestamp of the frame
+        """
+        if self.coasting:
+            # Fingers are back on the page, stop the fling
+            self.coasting = False
+            self.velocity = 0.0
+        
+        if self.last_add_time is not None and now > self.last_add_time:
+            instant = amount / (now - self.last_add_time)
+            self.velocity = 0.5 * self.velocity + 0.5 * instant
+        
+        self.pending += amount
+        self.last_add_time = now
+        self.active = True
+    
+    def release(self, now):
+        """
+        Signal that the scroll gesture ended (fingers lifted or hand lost).
+        
+        Args:
+            now: Monotonic timestamp of the frame
+        """
+        if not self.active:
+            return
+        
+        self.active = False
+        self.last_add_time = None
+        if self.momentum and abs(self.velocity) >= self.min_velocity:
+            self.coasting = True
+        else:
+            self.velocity = 0.0
+    
+    def update(self, now):
+        """
+        Advance momentum and return the scroll to send this frame.
+        
+        Args:
+            now: Monotonic timestamp of the frame
+        
+        Returns:
+            Scroll amount in wheel clicks to send now (a multiple of
+            1 / resolution), or 0 if nothing should be sent this frame
+        """
+        if self.last_update_time is None:
+            self.last_update_time = now
+        dt = now - self.last_update_time
+        self.last_update_time = now
+        
+        if self.coasting:
+            self.pending += self.velocity * dt
+            self.velocity *= math.exp(-self.decay * dt)
+            if abs(self.velocity) < self.min_velocity:
+                self.coasting = False
+                self.velocity = 0.0
+        elif (self.active and self.last_add_time is not None and
+              now - self.last_add_time > self.window):
+            # Holding still with the fingers up
+            self.velocity = 0.0
+        
+        if now - self.last_emit_time < self.min_interval:
+            return 0
+        
+        if self.active or self.coasting:
+            # Send whole backend steps only, keep the remainder for later
+            steps = int(self.pending * self.resolution)
+            self.pending -= steps / self.resolution
+        else:
+            # Gesture over: flush the remainder to the nearest step
+            steps = round(self.pending * self.resolution)
+            self.pending = 0.0
+        
+        if steps == 0:
+            return 0
+        
+        self.last_emit_time = now
+        return steps / self.resolution
@@ -0,0 +1,160 @@
+"""
+Synthetic hand landmark sequences for load testing the gesture recognizer.
+
+Generates (N, 21, 3) arrays in MediaPipe's normalized coordinate layout for
+pointing, left pinch, right pinch and two-finger scroll gestures, with the
+hand drifting around the frame and per-landmark jitter like a real tracker.
+"""
+import numpy as np
+import config
+from utils import Landmark
+
+NUM_LANDMARKS = 21
+GESTURES = ("point", "left_pinch", "right_pinch", "scroll")
+
+# Hand geometry in hand-size units, wrist at the origin and fingers pointing
+# up (negative y, as in image coordinates)
+_THUMB_JOINTS = ((-0.25, -0.15), (-0.40, -0.30), (-0.50, -0.42))  # CMC, MCP, IP
+_THUMB_TUCKED_TIP = (-0.32, -0.42)
+_FINGER_MCPS = ((-0.20, -0.55), (-0.02, -0.60), (0.15, -0.55), (0.30, -0.48))
+_FINGER_SEGMENTS = (0.25, 0.17, 0.14)  # MCP-PIP, PIP-DIP, DIP-TIP
+_FINGER_SPREAD = (-0.06, 0.0, 0.05, 0.10)  # Sideways lean of extended fingers
+
+HAND_SIZE = 0.18  # Wrist to middle fingertip is roughly this fraction of the frame
+
+
+def _finger(mcp, spread, extended):
+    """Return the four joints (MCP, PIP, DIP, TIP) of a finger."""
+    mx, my = mcp
+    if extended:
+        points = [(mx, my)]
+        x, y = mx, my
+        for length in _FINGER_SEGMENTS:
+            x += spread * length
+            y -= length
+            points.append((x, y))
+        return points
+    
+    # Curled: PIP sticks up, DIP and TIP fold back towards the palm
+    return [(mx, my), (mx, my - 0.20), (mx + 0.02, my - 0.08), (mx + 0.02, my + 0.05)]
+
+
+def hand_pose(extended=(True, False, False, False), thumb_tip=None):
+    """
+    Build one hand pose in hand-size units.
+    
+    Args:
+        extended: Whether index, middle, ring and pinky are extended
+        thumb_tip: (x, y) target for the thumb tip, or None for a tucked thumb
+    
+    Returns:
+        (21, 2) array of joint positions relative to the wrist
+    """
+    pose = np.zeros((NUM_LANDMARKS, 2), dtype=np.float64)
+    pose[1:4] = _THUMB_JOINTS
+    pose[4] = thumb_tip if thumb_tip is not None else _THUMB_TUCKED_TIP
+    
+    for finger, (mcp, spread, is_extended) in enumerate(
+            zip(_FINGER_MCPS, _FINGER_SPREAD, extended)):
+        start = 5 + finger * 4
+        pose[start:start + 4] = _finger(mcp, spread, is_extended)
+    
+    return pose
+
+
+def generate_sequence(gesture, num_frames, fps=config.TARGET_FPS, noise=0.002,
+                      seed=None):
+    """
+    Generate a landmark sequence for one gesture.
+    
+    Pinch gestures close and open about once per second, scroll moves the
+    two-finger hand up and down, and pointing drifts the hand around the frame.
+    
+    Args:
+        gesture: One of GESTURES
+        num_frames: Number of frames to generate
+        fps: Frame rate used to time the motion
+        noise: Standard deviation of per-landmark jitter (normalized units)
+        seed: Random seed for reproducible sequences
+    
+    Returns:
+        (num_frames, 21, 3) float32 array of normalized landmarks
+    """
+    if gesture not in GESTURES:
+        raise ValueError(f"Unknown gesture: {gesture}")
+    
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_frames) / fps
+    phase = rng.uniform(0, 2 * np.pi)
+    
+    # Wrist path: slow drift around the frame
+    wrist_x = 0.5 + 0.15 * np.sin(0.7 * t + phase)
+    wrist_y = 0.75 + 0.05 * np.cos(0.5 * t + phase)
+    
+    poses = np.empty((num_frames, NUM_LANDMARKS, 2), dtype=np.float64)
+    if gesture == "point":
+        poses[:] = hand_pose((True, False, False, False))
+    elif gesture == "scroll":
+        poses[:] = hand_pose((True, True, False, False))
+        wrist_y = 0.7 + 0.12 * np.sin(2 * np.pi * 0.8 * t + phase)
+    else:
+        # Thumb tip rises from below the pinching fingertip to touch it, so it
+        # never passes close to the other fingertip on the way
+        finger = 0 if gesture == "left_pinch" else 1
+        open_pose = hand_pose((True, True, False, False))
+        offset_x = -0.04 if finger == 0 else 0.04
+        target = open_pose[5 + finger * 4 + 3] + (offset_x, 0.03)
+        start = target + (0.0, 0.55)
+        closeness = np.clip(1.5 * np.sin(2 * np.pi * t + phase) + 0.5, 0.0, 1.0)
+        poses[:] = open_pose
+        poses[:, 4] = start + closeness[:, None] * (target - start)
+    
+    landmarks = np.empty((num_frames, NUM_LANDMARKS, 3), dtype=np.float32)
+    landmarks[:, :, 0] = wrist_x[:, None] + poses[:, :, 0] * HAND_SIZE
+    landmarks[:, :, 1] = wrist_y[:, None] + poses[:, :, 1] * HAND_SIZE
+    landmarks[:, :, 2] = -0.02 * np.abs(poses[:, :, 1])
+    landmarks += rng.normal(0.0, noise, size=landmarks.shape).astype(np.float32)
+    return landmarks
+
+
+def generate_mixed(num_frames, fps=config.TARGET_FPS, noise=0.002, segment_frames=90,
+                   seed=None):
+    """
+    Generate a sequence that switches between random gestures.
+    
+    Args:
+        num_frames: Number of frames to generate
+        fps: Frame rate used to time the motion
+        noise: Standard deviation of per-landmark jitter (normalized units)
+        segment_frames: Frames per gesture segment
+        seed: Random seed for reproducible sequences
+    
+    Returns:
+        (num_frames, 21, 3) float32 array of normalized landmarks
+    """
+    rng = np.random.default_rng(seed)
+    segments = []
+    remaining = num_frames
+    while remaining > 0:
+        length = min(segment_frames, remaining)
+        gesture = GESTURES[rng.integers(len(GESTURES))]
+        segments.append(generate_sequence(gesture, length, fps, noise,
+                                          seed=int(rng.integers(2 ** 31))))
+        remaining -= length
+    
+    if not segments:
+        return np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    return np.concatenate(segments)
+
+
+def to_landmark_list(row):
+    """
+    Convert one (21, 3) array row into a list of Landmark objects.
+    
+    Args:
+        row: (21, 3) array of normalized landmarks
+    
+    Returns:
+        List of 21 Landmark objects, usable wherever MediaPipe landmarks are
+    """
+    return [Landmark(float(x), float(y), float(z)) for x, y, z in row]
@@ -1,9 +1,16 @@
 """
 System controller for executing mouse and keyboard actions using PyAutoGUI.
 """
+import sys
 import pyautogui
 import config
 
+WHEEL_DELTA = 120  # Windows wheel units per notch
+MOUSEEVENTF_WHEEL = 0x0800
+
+# Raised by every action when the mouse is moved into a screen corner
+FailSafeException = pyautogui.FailSafeException
+
 
 class SystemController:
     """Wrapper for PyAutoGUI to control mouse and keyboard."""
@@ -15,6 +22,15 @@ class SystemController:
         pyautogui.PAUSE = 0  # No pause between actions for smooth movement
         
         self.screen_width, self.screen_height = pyautogui.size()
+        
+        # Windows accepts wheel deltas finer than one notch; other backends
+        # only take whole clicks
+        self._user32 = None
+        if config.SCROLL_HIGH_RESOLUTION and sys.platform == "win32":
+            import ctypes
+            self._user32 = ctypes.windll.user32
+        self.scroll_resolution = WHEEL_DELTA if self._user32 is not None else 1
+        
         print(f"System controller initialized: {self.screen_width}x{self.screen_height}")
     
     def move_cursor(self, x, y):
@@ -25,7 +41,9 @@ class SystemController:
             x: X coordinate in pixels
             y: Y coordinate in pixels
         """
-        # Apply boundary checking
+        # Apply boundary checking (coordinates may be sub-pixel floats)
+        x = int(x)
+        y = int(y)
         x = max(config.SCREEN_BOUNDARY_MARGIN, 
                 min(x, self.screen_width - config.SCREEN_BOUNDARY_MARGIN))
         y = max(config.SCREEN_BOUNDARY_MARGIN, 
@@ -60,9 +78,18 @@ class SystemController:
         Perform scroll action.
         
         Args:
-            amount: Scroll amount (positive = up, negative = down)
+            amount: Scroll amount in wheel clicks (positive = up, negative = down).
+                Fractions of 1 / scroll_resolution are sent as smooth scrolling
+                where supported; otherwise the amount is truncated to whole clicks.
         """
         try:
+            if self._user32 is not None:
+                delta = int(round(amount * WHEEL_DELTA))
+                if delta:
+                    # PyAutoGUI's own calls check the failsafe corner first
+                    pyautogui.failSafeCheck()
+                    self._user32.mouse_event(MOUSEEVENTF_WHEEL, 0, 0, delta, 0)
+                return
             pyautogui.scroll(int(amount))
         except pyautogui.FailSafeException:
             print("Failsafe triggered!")
@@ -3,46 +3,73 @@ Utility functions for gesture control application.
 """
 import math
 import time
-from collections import deque
-import pyautogui
+import numpy as np
 
 
 class SmoothingBuffer:
     """Moving average buffer for smoothing coordinate values."""
     
+    __slots__ = ("size", "values_x", "values_y", "count", "index",
+                 "sum_x", "sum_y", "average_x", "average_y")
+    
     def __init__(self, size=7):
         """
         Initialize smoothing buffer.
         
+        Values live in a preallocated ring with running sums, so adding a
+        value does not allocate.
+        
         Args:
             size: Number of values to keep in buffer
         """
-        self.buffer_x = deque(maxlen=size)
-        self.buffer_y = deque(maxlen=size)
+        self.size = size
+        self.values_x = [0.0] * size
+        self.values_y = [0.0] * size
+        self.count = 0
+        self.index = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.average_x = None
+        self.average_y = None
     
     def add(self, x, y):
-        """Add new coordinate to buffer."""
-        self.buffer_x.append(x)
-        self.buffer_y.append(y)
+        """Add new coordinate to buffer and update the averages."""
+        index = self.index
+        if self.count < self.size:
+            self.count += 1
+            self.sum_x += x
+            self.sum_y += y
+        else:
+            # Replace the oldest value
+            self.sum_x += x - self.values_x[index]
+            self.sum_y += y - self.values_y[index]
+        
+        self.values_x[index] = x
+        self.values_y[index] = y
+        self.index = (index + 1) % self.size
+        
+        self.average_x = self.sum_x / self.count
+        self.average_y = self.sum_y / self.count
     
     def get_average(self):
         """Get smoothed average coordinates."""
-        if not self.buffer_x or not self.buffer_y:
-            return None, None
-        
-        avg_x = sum(self.buffer_x) / len(self.buffer_x)
-        avg_y = sum(self.buffer_y) / len(self.buffer_y)
-        return avg_x, avg_y
+        return self.average_x, self.average_y
     
     def clear(self):
         """Clear the buffer."""
-        self.buffer_x.clear()
-        self.buffer_y.clear()
+        self.count = 0
+        self.index = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.average_x = None
+        self.average_y = None
 
 
 class FPSCounter:
     """Calculate frames per second."""
     
+    __slots__ = ("frame_count", "start_time", "fps")
+    
     def __init__(self):
         self.frame_count = 0
         self.start_time = time.time()
@@ -64,6 +91,8 @@ class FPSCounter:
 class CooldownTimer:
     """Timer for gesture cooldown periods."""
     
+    __slots__ = ("cooldown_seconds", "last_trigger_time")
+    
     def __init__(self, cooldown_seconds=0.5):
         """
         Initialize cooldown timer.
@@ -72,20 +101,44 @@ class CooldownTimer:
             cooldown_seconds: Seconds to wait between triggers
         """
         self.cooldown_seconds = cooldown_seconds
-        self.last_trigger_time = 0
+        self.last_trigger_time = -math.inf
     
-    def can_trigger(self):
-        """Check if enough time has passed since last trigger."""
-        current_time = time.time()
-        return (current_time - self.last_trigger_time) >= self.cooldown_seconds
+    def can_trigger(self, now=None):
+        """
+        Check if enough time has passed since last trigger.
+        
+        Args:
+            now: Monotonic timestamp of the current frame (default: read the clock)
+        """
+        if now is None:
+            now = time.monotonic()
+        return (now - self.last_trigger_time) >= self.cooldown_seconds
     
-    def trigger(self):
-        """Mark that a trigger has occurred."""
-        self.last_trigger_time = time.time()
+    def trigger(self, now=None):
+        """
+        Mark that a trigger has occurred.
+        
+        Args:
+            now: Monotonic timestamp of the current frame (default: read the clock)
+        """
+        if now is None:
+            now = time.monotonic()
+        self.last_trigger_time = now
     
     def reset(self):
         """Reset the cooldown timer."""
-        self.last_trigger_time = 0
+        self.last_trigger_time = -math.inf
+
+
+class Landmark:
+    """Landmark with x, y, z attributes, like MediaPipe's NormalizedLandmark."""
+    
+    __slots__ = ("x", "y", "z")
+    
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
 
 
 def calculate_distance(point1, point2):
@@ -112,7 +165,7 @@ def calculate_distance(point1, point2):
     return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
 
 
-def normalize_to_screen(x, y, frame_width, frame_height):
+def normalize_to_screen(x, y, frame_width, frame_height, screen_size=None, lut=None):
     """
     Convert normalized coordinates (0-1) to screen pixel coordinates.
     
@@ -121,15 +174,27 @@ def normalize_to_screen(x, y, frame_width, frame_height):
         y: Normalized y coordinate (0-1)
         frame_width: Width of camera frame
         frame_height: Height of camera frame
+        screen_size: Cached (width, height) of the screen (default: query PyAutoGUI)
+        lut: Optional calibrated ScreenLUT mapping camera to screen fractions
     
     Returns:
-        Tuple of (screen_x, screen_y) in pixels
+        Tuple of (screen_x, screen_y) in pixels, kept as floats for
+        sub-pixel precision (rounded when the cursor is moved)
     """
-    screen_width, screen_height = pyautogui.size()
+    if screen_size is None:
+        # Imported here so modules using the other helpers (batch workers,
+        # headless runs) do not need a display
+        import pyautogui
+        screen_size = pyautogui.size()
+    screen_width, screen_height = screen_size
+    
+    # Calibrated active region and response curve
+    if lut is not None:
+        x, y = lut.lookup(x, y)
     
     # Map normalized coordinates to screen space
-    screen_x = int(x * screen_width)
-    screen_y = int(y * screen_height)
+    screen_x = x * screen_width
+    screen_y = y * screen_height
     
     return screen_x, screen_y
 
@@ -152,3 +217,25 @@ def is_finger_extended(tip_landmark, pip_landmark, wrist_landmark):
     
     # Finger is extended if tip is farther from wrist than PIP joint
     return tip_distance > pip_distance
+
+
+def landmarks_to_array(landmarks, out=None):
+    """
+    Copy hand landmarks into a (21, 3) float32 array.
+    
+    Args:
+        landmarks: List of MediaPipe hand landmarks
+        out: Optional preallocated (21, 3) array to fill
+    
+    Returns:
+        Array of normalized (x, y, z) landmark coordinates
+    """
+    if out is None:
+        out = np.empty((len(landmarks), 3), dtype=np.float32)
+    
+    for i, landmark in enumerate(landmarks):
+        out[i, 0] = landmark.x
+        out[i, 1] = landmark.y
+        out[i, 2] = landmark.z
+    
+    return out